@@ -6,7 +6,10 @@ Uses SQLite for persistent storage with automatic schema initialization.
 import os
 import re
 import sqlite3
-from typing import List, Dict, Any, Optional
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Dict, Any, Iterator, Optional
 
 from dotenv import load_dotenv
 
@@ -17,16 +20,48 @@ DB_PATH = os.getenv(
     os.path.join(os.path.dirname(__file__), "data", "degree_path.db")
 )
 
+# PRAGMAs applied once when the shared connection is opened
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+UNIT_CODE_RE = re.compile(r"[A-Z]{4}\d{4}")
+
+# Units fetched per query when streaming the whole table
+UNIT_BATCH_SIZE = 100
+
+_conn: Optional[sqlite3.Connection] = None
+_db_lock = threading.RLock()
+
 def get_db_connection() -> sqlite3.Connection:
-    """Create database connection with row factory."""
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """
+    Return the process-wide database connection, opening it on first use.
+    
+    The connection is shared across threads, so callers must hold
+    `_db_lock` while using it. The schema is created when the connection is
+    first opened rather than at import time.
+    """
+    global _conn
+    with _db_lock:
+        if _conn is None:
+            os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+            conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for pragma in SQLITE_PRAGMAS:
+                conn.execute(pragma)
+            _create_schema(conn)
+            _conn = conn
+        return _conn
 
 def init_db() -> None:
-    """Initialize database schema."""
-    conn = get_db_connection()
+    """Initialize database schema (runs once per process)."""
+    get_db_connection()
+
+def _create_schema(conn: sqlite3.Connection) -> None:
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -59,81 +94,144 @@ def init_db() -> None:
             PRIMARY KEY (unit_code, prerequisite_code)
         )
     """)
+    
+    # prerequisites(unit_code) is already covered by its primary key
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_lo_unit ON learning_outcomes (unit_code)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_prereq_pcode ON prerequisites (prerequisite_code)')
 
     conn.commit()
-    conn.close()
+    
+    # Refresh planner statistics so the indexes are used
+    cursor.execute('ANALYZE')
 
 def save_unit(unit_data: Dict[str, Any]) -> None:
     """Save or update a unit in the database."""
-    conn = get_db_connection()
+    with _db_lock:
+        conn = get_db_connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            _save_units(conn, [unit_data])
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Error saving unit {unit_data.get('unit_code')}: {e}")
+        finally:
+            # Saving can also create placeholder units, so drop every cached read
+            _get_unit_cached.cache_clear()
+
+def save_units_batch(units: List[Dict[str, Any]]) -> int:
+    """Save or update many units in a single transaction.
+
+    Records missing a unit code, title or description are skipped so they cannot
+    roll back the rest of the batch. Database errors are re-raised after rollback.
+    Returns the number of units saved.
+    """
+    valid_units = []
+    for unit_data in units:
+        unit_code = unit_data.get('unit_code')
+        if not isinstance(unit_code, str) or not unit_code or 'title' not in unit_data or 'description' not in unit_data:
+            print(f"Skipping invalid unit record: {unit_code!r}")
+            continue
+        valid_units.append(unit_data)
+    if not valid_units:
+        return 0
+    
+    with _db_lock:
+        conn = get_db_connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            _save_units(conn, valid_units)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Error saving batch of {len(valid_units)} units: {e}")
+            raise
+        finally:
+            _get_unit_cached.cache_clear()
+    return len(valid_units)
+
+def _save_units(conn: sqlite3.Connection, units: List[Dict[str, Any]]) -> None:
+    """Write units and their child rows with executemany inside the caller's transaction."""
     cursor = conn.cursor()
+    # Normalize once on write so reads never need to upper() codes; last entry wins
+    by_code = {unit_data['unit_code'].upper(): unit_data for unit_data in units}
+    codes = list(by_code)
+    placeholders = ','.join('?' * len(codes))
     
-    try:
-        cursor.execute("""
-            INSERT OR REPLACE INTO units 
-            (unit_code, title, description, credit_points, year_level, 
-             raw_prerequisites, raw_corequisites)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            unit_data['unit_code'],
+    cursor.executemany("""
+        INSERT OR REPLACE INTO units 
+        (unit_code, title, description, credit_points, year_level, 
+         raw_prerequisites, raw_corequisites)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (
+            unit_code,
             unit_data['title'],
             unit_data['description'],
             unit_data.get('credit_points', 10),
             unit_data.get('year_level', 1),
             unit_data.get('raw_prerequisites', ''),
             unit_data.get('raw_corequisites', '')
-        ))
-        
-        cursor.execute(
-            'DELETE FROM learning_outcomes WHERE unit_code = ?',
-            (unit_data['unit_code'],)
         )
-        
-        for outcome in unit_data.get('learning_outcomes', []):
-            cursor.execute(
-                'INSERT INTO learning_outcomes (unit_code, outcome_text) VALUES (?, ?)',
-                (unit_data['unit_code'], outcome)
-            )
-        
-        raw_prereqs = unit_data.get('raw_prerequisites', '')
-        found_prereqs = set(re.findall(r"([A-Z]{4}\d{4})", raw_prereqs))
-        
-        if unit_data['unit_code'] in found_prereqs:
-            found_prereqs.remove(unit_data['unit_code'])
-        
-        cursor.execute(
-            'DELETE FROM prerequisites WHERE unit_code = ?',
-            (unit_data['unit_code'],)
-        )
-        
-        for p_code in found_prereqs:
-            cursor.execute('SELECT 1 FROM units WHERE unit_code = ?', (p_code,))
-            if not cursor.fetchone():
-                cursor.execute(
-                    'INSERT INTO units (unit_code, title) VALUES (?, ?)',
-                    (p_code, "Placeholder Unit")
-                )
-            
-            cursor.execute(
-                'INSERT INTO prerequisites (unit_code, prerequisite_code) VALUES (?, ?)',
-                (unit_data['unit_code'], p_code)
-            )
-        
-        conn.commit()
-    except Exception as e:
-        print(f"Error saving unit {unit_data.get('unit_code')}: {e}")
-    finally:
-        conn.close()
+        for unit_code, unit_data in by_code.items()
+    ])
+    
+    cursor.execute(f'DELETE FROM learning_outcomes WHERE unit_code IN ({placeholders})', codes)
+    cursor.executemany(
+        'INSERT INTO learning_outcomes (unit_code, outcome_text) VALUES (?, ?)',
+        [
+            (unit_code, outcome)
+            for unit_code, unit_data in by_code.items()
+            for outcome in unit_data.get('learning_outcomes', [])
+        ]
+    )
+    
+    prereq_rows = []
+    for unit_code, unit_data in by_code.items():
+        found_prereqs = set(UNIT_CODE_RE.findall(unit_data.get('raw_prerequisites', '')))
+        found_prereqs.discard(unit_code)
+        prereq_rows.extend((unit_code, p_code) for p_code in sorted(found_prereqs))
+    
+    cursor.execute(f'DELETE FROM prerequisites WHERE unit_code IN ({placeholders})', codes)
+    
+    if not prereq_rows:
+        return
+    
+    referenced = sorted({p_code for _, p_code in prereq_rows})
+    ref_placeholders = ','.join('?' * len(referenced))
+    cursor.execute(f'SELECT unit_code FROM units WHERE unit_code IN ({ref_placeholders})', referenced)
+    existing = {r['unit_code'] for r in cursor.fetchall()}
+    
+    cursor.executemany(
+        'INSERT INTO units (unit_code, title) VALUES (?, ?)',
+        [(p_code, "Placeholder Unit") for p_code in referenced if p_code not in existing]
+    )
+    cursor.executemany(
+        'INSERT INTO prerequisites (unit_code, prerequisite_code) VALUES (?, ?)',
+        prereq_rows
+    )
 
 def get_unit(unit_code: str) -> Optional[Dict[str, Any]]:
-    conn = get_db_connection()
+    """Get a unit by code, served from an LRU cache invalidated on save."""
+    unit = _get_unit_cached(unit_code)
+    return copy_unit(unit) if unit else None
+
+def copy_unit(unit: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a unit dict and its list fields, so callers can modify the result without touching a cache."""
+    return {key: list(value) if isinstance(value, list) else value for key, value in unit.items()}
+
+@lru_cache(maxsize=2048)
+def _get_unit_cached(unit_code: str) -> Optional[Dict[str, Any]]:
+    with _db_lock:
+        return _get_unit(get_db_connection(), unit_code)
+
+def _get_unit(conn: sqlite3.Connection, unit_code: str) -> Optional[Dict[str, Any]]:
     cursor = conn.cursor()
     
     cursor.execute('SELECT * FROM units WHERE unit_code = ?', (unit_code,))
     row = cursor.fetchone()
     
     if not row:
-        conn.close()
         return None
     
     unit = dict(row)
@@ -150,22 +248,87 @@ def get_unit(unit_code: str) -> Optional[Dict[str, Any]]:
     unit['corequisites'] = []  # Placeholder for parsed coreqs if we add a table for them
     unit['incompatible_units'] = [] # Placeholder
     
-    conn.close()
     return unit
 
+def get_prerequisite_map(unit_codes: List[str]) -> Dict[str, List[str]]:
+    """
+    Get prerequisite codes for many units in one query.
+    
+    Only units with real data are included, so codes missing from the result
+    (unknown or placeholder units) still need a live lookup.
+    """
+    if not unit_codes:
+        return {}
+    
+    codes = list(dict.fromkeys(unit_codes))
+    placeholders = ','.join('?' * len(codes))
+    prereq_map: Dict[str, List[str]] = {}
+    
+    with _db_lock:
+        cursor = get_db_connection().cursor()
+        cursor.execute(f"""
+            SELECT u.unit_code, p.prerequisite_code
+            FROM units u
+            LEFT JOIN prerequisites p ON p.unit_code = u.unit_code
+            WHERE u.unit_code IN ({placeholders})
+              AND u.title IS NOT NULL AND u.title != 'Placeholder Unit'
+        """, codes)
+        for r in cursor.fetchall():
+            prereqs = prereq_map.setdefault(r['unit_code'], [])
+            if r['prerequisite_code']:
+                prereqs.append(r['prerequisite_code'])
+    
+    return prereq_map
+
+def iter_all_units(batch_size: int = UNIT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every unit with its outcomes and prerequisites, one batch at a time.
+    
+    Each batch is a keyset-paginated query plus two IN queries for its child
+    rows, so memory stays bounded and the lock is never held across a yield.
+    """
+    last_code = ''
+    while True:
+        with _db_lock:
+            cursor = get_db_connection().cursor()
+            cursor.execute(
+                'SELECT * FROM units WHERE unit_code > ? ORDER BY unit_code LIMIT ?',
+                (last_code, batch_size)
+            )
+            unit_rows = cursor.fetchall()
+            if not unit_rows:
+                return
+            
+            codes = [row['unit_code'] for row in unit_rows]
+            placeholders = ','.join('?' * len(codes))
+            
+            outcomes_by_unit = defaultdict(list)
+            cursor.execute(
+                f'SELECT unit_code, outcome_text FROM learning_outcomes WHERE unit_code IN ({placeholders})',
+                codes
+            )
+            for r in cursor.fetchall():
+                outcomes_by_unit[r['unit_code']].append(r['outcome_text'])
+            
+            prereqs_by_unit = defaultdict(list)
+            cursor.execute(
+                f'SELECT unit_code, prerequisite_code FROM prerequisites WHERE unit_code IN ({placeholders})',
+                codes
+            )
+            for r in cursor.fetchall():
+                prereqs_by_unit[r['unit_code']].append(r['prerequisite_code'])
+        
+        for row in unit_rows:
+            unit = dict(row)
+            unit_code = unit['unit_code']
+            unit['learning_outcomes'] = outcomes_by_unit.get(unit_code, [])
+            unit['prerequisites'] = prereqs_by_unit.get(unit_code, [])
+            unit['corequisites'] = []
+            unit['incompatible_units'] = []
+            yield unit
+        
+        last_code = codes[-1]
+
 def get_all_units() -> Dict[str, Any]:
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT unit_code FROM units')
-    rows = cursor.fetchall()
-    conn.close()
-    
-    all_units = {}
-    for row in rows:
-        unit = get_unit(row['unit_code'])
-        if unit:
-            all_units[unit['unit_code']] = unit
-    return all_units
-
-# Initialize DB on module load (or call explicitly)
-init_db()
+    """Load every unit with its outcomes and prerequisites, keyed by unit code."""
+    return {unit['unit_code']: unit for unit in iter_all_units()}
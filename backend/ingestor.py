@@ -1,11 +1,36 @@
+import asyncio
 import requests
+import httpx
 from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 import re
-from .database import save_unit
+from .database import init_db, save_units_batch
 import time
 
 BASE_URL = "https://unitguides.mq.edu.au"
 
+# Politeness limits for concurrent unit guide fetches
+MAX_CONCURRENT_REQUESTS = 8
+REQUESTS_PER_SECOND = 5
+
+# Patterns compiled once and reused for every scraped page
+# e.g. "COMP1000 – Introduction to Computer Programming" (hyphen, en dash or em dash)
+UNIT_HEADING_RE = re.compile(r"([A-Z]{4}\d{4})\s*[–\-—]\s*(.*)")
+GENERAL_INFO_RE = re.compile("General Information", re.I)
+LEARNING_OUTCOMES_RE = re.compile("Learning Outcomes", re.I)
+PREREQ_RE = re.compile(
+    r"(?:Prerequisite[s]?|Pre-requisite[s]?)\s*[:]?\s*(.*?)(?:\n\n|\n[A-Z]|$)",
+    re.IGNORECASE | re.DOTALL
+)
+COREQ_RE = re.compile(
+    r"(?:Corequisite[s]?|Co-requisite[s]?)\s*[:]?\s*(.*?)(?:\n\n|\n[A-Z]|$)",
+    re.IGNORECASE | re.DOTALL
+)
+# Single-line variants used on the narrowed enrolment requirements section
+ENROLMENT_HEADING_RE = re.compile(r"Enrolment Requirements|Prerequisites?", re.I)
+PREREQ_LINE_RE = re.compile(r"(?:Prerequisite[s]?|Pre-requisite[s]?)\s*[:]?\s*([^\n]+)", re.I)
+COREQ_LINE_RE = re.compile(r"(?:Corequisite[s]?|Co-requisite[s]?)\s*[:]?\s*([^\n]+)", re.I)
+
 def scrape_unit_list(department_url: str):
     """
     Scrapes a list of unit guide URLs from a department page.
@@ -17,36 +42,83 @@ def scrape_unit_list(department_url: str):
         print(f"Failed to fetch {department_url}")
         return []
 
-    soup = BeautifulSoup(response.content, 'html.parser')
-    unit_links = []
-    
-    # Find all links that look like unit guides
-    # The structure usually has links with class or specific pattern
+    # Evaluate the link filter as XPath in lxml's C core; no soup tree is built
     # Based on observation: <a href="/unit_offerings/173183/unit_guide">COMP1000 ...</a>
+    root = lxml_html.fromstring(response.content)
+    hrefs = root.xpath(
+        '//a[contains(@href, "/unit_offerings/") and contains(@href, "/unit_guide")]/@href'
+    )
+    unit_links = [BASE_URL + href if href.startswith("/") else href for href in hrefs]
     
-    for a in soup.find_all('a', href=True):
-        href = a['href']
-        if "/unit_offerings/" in href and "/unit_guide" in href:
-            full_url = BASE_URL + href if href.startswith("/") else href
-            unit_links.append(full_url)
-            
-    return list(set(unit_links)) # Deduplicate
+    return list(dict.fromkeys(unit_links)) # Deduplicate, keeping page order
 
-def scrape_unit_detail(unit_url: str):
+class RateLimiter:
+    """Spaces out request starts so at most `rate` begin per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_slot > now:
+                await asyncio.sleep(self._next_slot - now)
+                now = self._next_slot
+            self._next_slot = now + self.interval
+
+async def scrape_unit_detail(
+    client: httpx.AsyncClient,
+    unit_url: str,
+    semaphore: asyncio.Semaphore,
+    limiter: RateLimiter
+):
     """
-    Scrapes details for a single unit.
+    Fetches and parses a single unit.
+    Parsing runs in a worker thread to keep the event loop free.
     """
-    print(f"Scraping unit: {unit_url}")
-    try:
-        response = requests.get(unit_url)
-        if response.status_code != 200:
-            print(f"Failed to fetch {unit_url}")
+    async with semaphore:
+        await limiter.wait()
+        print(f"Scraping unit: {unit_url}")
+        try:
+            response = await client.get(unit_url)
+            if response.status_code != 200:
+                print(f"Failed to fetch {unit_url}")
+                return
+        except Exception as e:
+            print(f"Error fetching {unit_url}: {e}")
             return
+
+    try:
+        return await asyncio.to_thread(parse_unit_detail, response.content)
     except Exception as e:
-        print(f"Error fetching {unit_url}: {e}")
+        # One malformed page must not abort the whole scrape
+        print(f"Error parsing {unit_url}: {e}")
         return
 
-    soup = BeautifulSoup(response.content, 'html.parser')
+def extract_enrolment_section(soup: BeautifulSoup) -> str:
+    """
+    Returns the text between the enrolment requirements heading and the next
+    heading of the same level, or an empty string if the page has no such heading.
+    """
+    heading = soup.find(['h2', 'h3'], string=ENROLMENT_HEADING_RE)
+    if not heading:
+        return ""
+
+    stop_at = ['h2'] if heading.name == 'h2' else ['h2', 'h3']
+    parts = []
+    for sib in heading.find_next_siblings():
+        if sib.name in stop_at:
+            break
+        parts.append(sib.get_text("\n"))
+    return "\n".join(parts)
+
+def parse_unit_detail(content: bytes):
+    """
+    Parses unit details from a unit guide page.
+    """
+    soup = BeautifulSoup(content, 'lxml')
     
     # Extract Title and Code
     # Find all H1s and look for the pattern
@@ -56,9 +128,7 @@ def scrape_unit_detail(unit_url: str):
     for h1 in soup.find_all('h1'):
         text = h1.get_text(strip=True)
         # Pattern: 4 letters, 4 digits, optional space, hyphen/dash, space, title
-        # e.g. "COMP1000 – Introduction to Computer Programming"
-        # Note: The dash might be a hyphen -, en dash –, or em dash —
-        match = re.search(r"([A-Z]{4}\d{4})\s*[–-—]\s*(.*)", text)
+        match = UNIT_HEADING_RE.search(text)
         if match:
             unit_code = match.group(1)
             title = match.group(2)
@@ -71,17 +141,16 @@ def scrape_unit_detail(unit_url: str):
     # Extract Description (General Information)
     description = ""
     # Look for h2 "General Information"
-    gen_info = soup.find('h2', string=re.compile("General Information", re.I))
+    gen_info = soup.find('h2', string=GENERAL_INFO_RE)
     if gen_info:
         # The content is usually in the next sibling div or the parent's next sibling
         # Let's try to get the text of the parent section if possible, or just next siblings
-        # A robust way is to iterate next_siblings until the next h2
+        # A robust way is to iterate sibling tags (skipping bare strings) until the next h2
         content_parts = []
-        curr = gen_info.next_sibling
-        while curr and curr.name != 'h2':
-            if curr.name: # if it's a tag
-                content_parts.append(curr.get_text(strip=True))
-            curr = curr.next_sibling
+        for sib in gen_info.find_next_siblings():
+            if sib.name == 'h2':
+                break
+            content_parts.append(sib.get_text(strip=True))
         description = " ".join(content_parts)
         
         # Fallback: if empty, try parent's text
@@ -92,38 +161,43 @@ def scrape_unit_detail(unit_url: str):
 
     # Extract Learning Outcomes
     outcomes = []
-    lo_header = soup.find('h2', string=re.compile("Learning Outcomes", re.I))
+    lo_header = soup.find('h2', string=LEARNING_OUTCOMES_RE)
     if lo_header:
-        # Look for the list in the following siblings
-        curr = lo_header.next_sibling
-        while curr and curr.name != 'h2':
-            if curr.name == 'ul' or curr.name == 'ol':
-                outcomes = [li.get_text(strip=True) for li in curr.find_all('li')]
+        # Look for the list in the following sibling tags
+        for sib in lo_header.find_next_siblings():
+            if sib.name == 'h2':
+                break
+            if sib.name == 'ul' or sib.name == 'ol':
+                outcomes = [li.get_text(strip=True) for li in sib.find_all('li')]
                 break
             # If it's a div, check inside
-            if curr.name == 'div':
-                ul = curr.find('ul') or curr.find('ol')
+            if sib.name == 'div':
+                ul = sib.find('ul') or sib.find('ol')
                 if ul:
                     outcomes = [li.get_text(strip=True) for li in ul.find_all('li')]
                     break
-            curr = curr.next_sibling
 
     # Extract Prerequisites / Enrolment Requirements
     raw_prereqs = ""
     raw_coreqs = ""
     
-    body_text = soup.get_text()
+    # Search only the enrolment requirements section first; it is a fraction
+    # of the page and a single-line pattern is enough there.
+    section_text = extract_enrolment_section(soup)
+    prereq_match = PREREQ_LINE_RE.search(section_text)
+    coreq_match = COREQ_LINE_RE.search(section_text)
     
-    # Regex for Prerequisites
+    # Fall back to scanning the whole page text only when there is no section;
+    # a unit with no corequisite line would otherwise always take the slow path
     # "Prerequisite: COMP1000" or "Pre-requisite: ..." or "Prerequisites: Admission to MRes"
-    # We need to be careful not to capture too much garbage.
     # Try to capture until the next major label or end of paragraph.
-    prereq_match = re.search(r"(?:Prerequisite[s]?|Pre-requisite[s]?)\s*[:]?\s*(.*?)(?:\n\n|\n[A-Z]|$)", body_text, re.IGNORECASE | re.DOTALL)
+    if not section_text:
+        body_text = soup.get_text()
+        prereq_match = PREREQ_RE.search(body_text)
+        coreq_match = COREQ_RE.search(body_text)
+    
     if prereq_match:
-        # Take the first line or few sentences
         raw_prereqs = prereq_match.group(1).strip()
-        
-    coreq_match = re.search(r"(?:Corequisite[s]?|Co-requisite[s]?)\s*[:]?\s*(.*?)(?:\n\n|\n[A-Z]|$)", body_text, re.IGNORECASE | re.DOTALL)
     if coreq_match:
         raw_coreqs = coreq_match.group(1).strip()
 
@@ -134,37 +208,58 @@ def scrape_unit_detail(unit_url: str):
         "learning_outcomes": outcomes,
         "raw_prerequisites": raw_prereqs,
         "raw_corequisites": raw_coreqs,
-        "year_level": int(unit_code[4]) if len(unit_code) > 4 and unit_code[4].isdigit() else 1
+        # unit_code matched UNIT_HEADING_RE, so its fifth character is always a digit
+        "year_level": int(unit_code[4])
     }
     
-    print(f"Saving {unit_code}...")
-    save_unit(unit_data)
     return unit_data
 
+async def scrape_units(links):
+    """
+    Scrapes all unit URLs concurrently, bounded by MAX_CONCURRENT_REQUESTS
+    and REQUESTS_PER_SECOND.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    limiter = RateLimiter(REQUESTS_PER_SECOND)
+    async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
+        results = await asyncio.gather(
+            *(scrape_unit_detail(client, link, semaphore, limiter) for link in links),
+            return_exceptions=True
+        )
+    for link, result in zip(links, results):
+        if isinstance(result, Exception):
+            print(f"Error scraping {link}: {result}")
+    return [unit for unit in results if unit and not isinstance(unit, Exception)]
+
 def run_scraper():
     # Example: Scrape School of Computing
     dept_url = "https://unitguides.mq.edu.au/units/show_year/2025/School%20of%20Computing"
     links = scrape_unit_list(dept_url)
     print(f"Found {len(links)} units.")
     
-    count = 0
-    for link in links:
-        # if count >= 20: break # Limit removed to scrape all units
-        pass
-        scrape_unit_detail(link)
-        count += 1
-        time.sleep(1) # Be polite
+    # Concurrent fetches are rate limited instead of sleeping between units
+    units = asyncio.run(scrape_units(links))
+    print(f"Saving {len(units)} units...")
+    try:
+        saved = save_units_batch(units)
+    except Exception as e:
+        print(f"Saving units failed: {e}")
+        return
+    print(f"Saved {saved} units.")
 
     # Trigger RAG Ingestion
     print("Triggering RAG Ingestion...")
     try:
         # Import here to avoid potential circular imports at top level if any
         from .rag import rag_system
-        import asyncio
         asyncio.run(rag_system.ingest_units())
         print("RAG Ingestion Complete.")
     except Exception as e:
         print(f"RAG Ingestion Failed: {e}")
 
-if __name__ == "__main__":
+def main():
+    init_db()
     run_scraper()
+
+if __name__ == "__main__":
+    main()
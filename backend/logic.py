@@ -34,7 +34,8 @@ def check_prereqs(
     potential_prereqs = unit_data.get("prerequisites", [])
     potential_prereqs = [p for p in potential_prereqs if p != target_unit]
     
-    missing = [p for p in potential_prereqs if p not in completed_units]
+    completed_set = frozenset(u.upper() for u in completed_units)
+    missing = [p for p in potential_prereqs if p not in completed_set]
     
     return {"eligible": len(missing) == 0, "missing": missing}
 
@@ -4,8 +4,11 @@ Provides unit information with live web search and database fallback.
 """
 
 import os
-import re
-from typing import List, Dict, Any, Optional
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Tuple
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, BackgroundTasks
@@ -14,19 +17,36 @@ from pydantic import BaseModel, Field
 
 from .models import EligibilityRequest, EligibilityResponse, UnitResponse, Unit
 from .logic import check_prereqs, check_incompatibles
-from .database import get_unit, save_unit
+from .database import (
+    UNIT_CODE_RE, init_db, get_unit, copy_unit, save_unit, save_units_batch, get_prerequisite_map
+)
 from .rag import rag_system
-from .unit_search import search_unit, unit_searcher
+from .unit_search import search_unit, search_units, unit_searcher
 
 load_dotenv()
 
 # Configuration
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
+LIVE_UNIT_CACHE_TTL = float(os.getenv("LIVE_UNIT_CACHE_TTL", "60"))
+LIVE_UNIT_CACHE_SIZE = 1024
+
+# (unit_code, use_cache) -> (expires_at, unit_data) for recent get_unit_with_live_first results;
+# keyed on use_cache too so a DB-first result is never served to a live-first caller
+_live_unit_cache: Dict[Tuple[str, bool], Tuple[float, Dict[str, Any]]] = {}
+# Callers run in worker threads (sync endpoints, asyncio.to_thread); held only around dict updates
+_live_unit_cache_lock = threading.Lock()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    yield
+
 
 app = FastAPI(
     title="DegreePath Tutor - Part 1",
     description="Unit database, RAG system, and eligibility checking API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -58,6 +78,20 @@ class SmartSearchRequest(BaseModel):
 
 # Helper Functions
 
+def to_unit_record(live_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a live search result to the fields stored by save_unit."""
+    return {
+        "unit_code": live_data["unit_code"],
+        "title": live_data["title"],
+        "description": live_data["description"],
+        "credit_points": live_data["credit_points"],
+        "year_level": live_data["year_level"],
+        "raw_prerequisites": live_data["raw_prerequisites"],
+        "raw_corequisites": live_data["raw_corequisites"],
+        "learning_outcomes": live_data["learning_outcomes"]
+    }
+
+
 def get_unit_with_live_first(unit_code: str, use_cache: bool = False) -> Optional[Dict[str, Any]]:
     """
     Get unit data with live web search as primary source.
@@ -65,9 +99,31 @@ def get_unit_with_live_first(unit_code: str, use_cache: bool = False) -> Optiona
     Priority:
         1. Live web search (accurate prerequisites)
         2. Database (cache/fallback)
+    
+    Results are memoized for LIVE_UNIT_CACHE_TTL seconds so repeated lookups
+    (e.g. prerequisite chains) don't hit the network again.
+    
+    unit_code is expected to be uppercase already (normalized by the caller).
     """
-    unit_code = unit_code.upper()
+    key = (unit_code, use_cache)
+    with _live_unit_cache_lock:
+        cached = _live_unit_cache.get(key)
+        if cached:
+            if cached[0] > time.monotonic():
+                return copy_unit(cached[1])
+            del _live_unit_cache[key]
     
+    unit_data = _fetch_unit_with_live_first(unit_code, use_cache)
+    if unit_data:
+        with _live_unit_cache_lock:
+            if len(_live_unit_cache) >= LIVE_UNIT_CACHE_SIZE and key not in _live_unit_cache:
+                del _live_unit_cache[next(iter(_live_unit_cache))]
+            _live_unit_cache[key] = (time.monotonic() + LIVE_UNIT_CACHE_TTL, unit_data)
+        return copy_unit(unit_data)
+    return None
+
+
+def _fetch_unit_with_live_first(unit_code: str, use_cache: bool) -> Optional[Dict[str, Any]]:
     if use_cache:
         unit_data = get_unit(unit_code)
         if unit_data and unit_data.get("title") and unit_data["title"] != "Placeholder Unit":
@@ -76,16 +132,7 @@ def get_unit_with_live_first(unit_code: str, use_cache: bool = False) -> Optiona
     live_data = search_unit(unit_code)
     
     if live_data and live_data.get("unit_code"):
-        save_unit({
-            "unit_code": live_data["unit_code"],
-            "title": live_data["title"],
-            "description": live_data["description"],
-            "credit_points": live_data["credit_points"],
-            "year_level": live_data["year_level"],
-            "raw_prerequisites": live_data["raw_prerequisites"],
-            "raw_corequisites": live_data["raw_corequisites"],
-            "learning_outcomes": live_data["learning_outcomes"]
-        })
+        save_unit(to_unit_record(live_data))
         
         return {
             "unit_code": live_data["unit_code"],
@@ -111,6 +158,40 @@ def get_unit_with_live_first(unit_code: str, use_cache: bool = False) -> Optiona
     return None
 
 
+async def build_prerequisite_chain(unit_code: str, prerequisites: List[str], max_depth: int = 3) -> List[str]:
+    """
+    Breadth-first walk of the prerequisite graph, up to max_depth levels.
+    
+    Each level is resolved with one batched database query; only codes the
+    database doesn't know are looked up live, concurrently.
+    """
+    chain = [unit_code]
+    frontier = prerequisites
+    
+    for depth in range(max_depth):
+        level = [p for p in dict.fromkeys(frontier) if p not in chain]
+        if not level:
+            break
+        chain.extend(level)
+        
+        if depth == max_depth - 1:
+            break
+        
+        prereq_map = get_prerequisite_map(level)
+        missing = [p for p in level if p not in prereq_map]
+        if missing:
+            live_units = await asyncio.gather(
+                *(asyncio.to_thread(get_unit_with_live_first, p, True) for p in missing)
+            )
+            for p, live_data in zip(missing, live_units):
+                if live_data:
+                    prereq_map[p] = live_data.get("prerequisites", [])
+        
+        frontier = [nxt for p in level for nxt in prereq_map.get(p, [])]
+    
+    return chain
+
+
 # Endpoints
 
 @app.get("/")
@@ -216,7 +297,7 @@ def check_eligibility(request: EligibilityRequest):
             "errors": ["No query units provided"]
         }
     
-    target_unit = request.query_units[0].upper()
+    target_unit = request.query_units[0]
     unit_data = get_unit_with_live_first(target_unit)
     
     if not unit_data:
@@ -228,9 +309,10 @@ def check_eligibility(request: EligibilityRequest):
         }
     
     prerequisites = unit_data.get("prerequisites", [])
-    completed_upper = [u.upper() for u in request.completed_units]
+    completed_set = frozenset(request.completed_units)
     
-    missing = [p for p in prerequisites if p.upper() not in completed_upper]
+    # Prerequisite codes are extracted with an uppercase-only pattern
+    missing = [p for p in prerequisites if p not in completed_set]
     incompatibles = check_incompatibles(request.completed_units, target_unit)
     
     is_eligible = len(missing) == 0 and len(incompatibles) == 0
@@ -246,9 +328,7 @@ def check_eligibility(request: EligibilityRequest):
 @app.post("/rag/ingest")
 async def trigger_ingest(background_tasks: BackgroundTasks):
     """Trigger RAG ingestion in background."""
-    background_tasks.add_task(rag_system.ingest_units)
-    background_tasks.add_task(rag_system.ingest_skills)
-    background_tasks.add_task(rag_system.ingest_materials)
+    background_tasks.add_task(rag_system.ingest_all)
     return {"message": "Ingestion started in background"}
 
 
@@ -258,34 +338,20 @@ async def ingest_live_units(background_tasks: BackgroundTasks, unit_codes: Optio
     
     async def fetch_and_ingest():
         if unit_codes:
-            for code in unit_codes:
-                live_data = search_unit(code)
-                if live_data:
-                    save_unit({
-                        "unit_code": live_data["unit_code"],
-                        "title": live_data["title"],
-                        "description": live_data["description"],
-                        "credit_points": live_data["credit_points"],
-                        "year_level": live_data["year_level"],
-                        "raw_prerequisites": live_data["raw_prerequisites"],
-                        "raw_corequisites": live_data["raw_corequisites"],
-                        "learning_outcomes": live_data["learning_outcomes"]
-                    })
+            codes = unit_codes
         else:
-            all_codes = unit_searcher.get_all_computing_units()
-            for code in all_codes[:50]:
-                live_data = search_unit(code)
-                if live_data:
-                    save_unit({
-                        "unit_code": live_data["unit_code"],
-                        "title": live_data["title"],
-                        "description": live_data["description"],
-                        "credit_points": live_data["credit_points"],
-                        "year_level": live_data["year_level"],
-                        "raw_prerequisites": live_data["raw_prerequisites"],
-                        "raw_corequisites": live_data["raw_corequisites"],
-                        "learning_outcomes": live_data["learning_outcomes"]
-                    })
+            all_codes = await asyncio.to_thread(unit_searcher.get_all_computing_units)
+            codes = all_codes[:50]
+        
+        # Concurrent fetches; units already in the on-disk unit cache skip the network
+        live_units = await search_units(codes)
+        # Single writer: one transaction for the whole batch
+        try:
+            saved = await asyncio.to_thread(save_units_batch, [to_unit_record(d) for d in live_units])
+        except Exception as e:
+            print(f"Live ingestion aborted, saving units failed: {e}")
+            return
+        print(f"Saved {saved} of {len(codes)} live units")
         
         await rag_system.ingest_units()
     
@@ -306,7 +372,7 @@ async def query_rag(request: RAGQueryRequest):
     
     live_results = []
     if request.include_live:
-        unit_codes = re.findall(r'[A-Z]{4}\d{4}', request.query.upper())
+        unit_codes = UNIT_CODE_RE.findall(request.query.upper())
         for code in unit_codes[:3]:
             live_data = search_unit(code)
             if live_data:
@@ -340,7 +406,7 @@ async def smart_search(request: SmartSearchRequest):
         "prerequisite_chains": []
     }
     
-    unit_codes = re.findall(r'[A-Z]{4}\d{4}', request.query.upper())
+    unit_codes = UNIT_CODE_RE.findall(request.query.upper())
     
     for code in unit_codes[:5]:
         unit_data = get_unit_with_live_first(code, use_cache=True)
@@ -355,20 +421,7 @@ async def smart_search(request: SmartSearchRequest):
             })
             
             if request.include_prerequisites and unit_data.get("prerequisites"):
-                chain = [code]
-                prereqs = unit_data.get("prerequisites", [])
-                
-                for _ in range(3):
-                    next_prereqs = []
-                    for prereq in prereqs:
-                        if prereq not in chain:
-                            chain.append(prereq)
-                            prereq_data = get_unit_with_live_first(prereq, use_cache=True)
-                            if prereq_data:
-                                next_prereqs.extend(prereq_data.get("prerequisites", []))
-                    prereqs = next_prereqs
-                    if not prereqs:
-                        break
+                chain = await build_prerequisite_chain(code, unit_data["prerequisites"])
                 
                 results["prerequisite_chains"].append({
                     "unit": code,
@@ -3,11 +3,13 @@ Pydantic models for API request/response validation.
 """
 
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class Unit(BaseModel):
     """Unit details model."""
+    model_config = ConfigDict(frozen=True)
+
     title: str = Field(..., description="The full title of the unit")
     prerequisites: List[str] = Field(..., description="List of prerequisite unit codes")
     corequisites: List[str] = Field(..., description="List of corequisite unit codes")
@@ -19,20 +21,32 @@ class Unit(BaseModel):
 
 class EligibilityRequest(BaseModel):
     """Request model for eligibility checking."""
+    model_config = ConfigDict(str_strip_whitespace=True, revalidate_instances='never')
+
     degree: str = Field(..., description="Student's enrolled degree")
     completed_units: List[str] = Field(..., description="List of completed unit codes")
     query_units: List[str] = Field(..., description="Unit codes to check eligibility for")
 
+    @field_validator("completed_units", "query_units")
+    @classmethod
+    def normalize_unit_codes(cls, codes: List[str]) -> List[str]:
+        """Uppercase unit codes once at the request boundary."""
+        return [code.upper() for code in codes]
+
 
 class EligibilityResponse(BaseModel):
     """Response model for eligibility checking."""
+    model_config = ConfigDict(frozen=True)
+
     eligible: bool = Field(..., description="Whether the student is eligible")
     missing_prerequisites: List[str] = Field(..., description="Missing prerequisite units")
     incompatible_units: List[str] = Field(..., description="Incompatible units already taken")
-    errors: List[str] = Field(default=[], description="Any errors encountered")
+    errors: List[str] = Field(default_factory=list, description="Any errors encountered")
 
 
 class UnitResponse(BaseModel):
     """Response model for unit lookup."""
+    model_config = ConfigDict(frozen=True)
+
     unit_code: str = Field(..., description="The unit code")
     details: Unit = Field(..., description="Unit details")
@@ -4,11 +4,14 @@ Uses ChromaDB for vector storage and HuggingFace embeddings for semantic search.
 """
 
 import os
+import re
 import json
 import asyncio
 import hashlib
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Sequence
 
+import numpy as np
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
@@ -29,73 +32,122 @@ QUERY_EXPANSIONS = {
     "be": "backend",
 }
 
+# One case-insensitive, whole-word pass over the query for every abbreviation
+QUERY_EXPANSION_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, QUERY_EXPANSIONS)) + r")\b",
+    re.IGNORECASE
+)
+
+# Texts per embedding forward pass
+EMBED_BATCH_SIZE = 64
+# Documents per collection write; each write embeds in EMBED_BATCH_SIZE passes
+INGEST_BATCH_SIZE = 256
+# Dedicated threads for embedding and Chroma calls, so ingest and queries can overlap
+RAG_EXECUTOR_WORKERS = 2
+
 class RAGSystem:
     """Vector-based retrieval system for semantic search over unit information."""
     
     def __init__(self):
+        self._configure_torch_threads()
+        self._exec = ThreadPoolExecutor(max_workers=RAG_EXECUTOR_WORKERS, thread_name_prefix="rag")
         self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
+            model_name="sentence-transformers/all-MiniLM-L6-v2",
+            model_kwargs={"device": self._detect_device()},
+            encode_kwargs={"batch_size": EMBED_BATCH_SIZE}
         )
         self.vector_store = Chroma(
             persist_directory=CHROMA_DB_DIR,
             embedding_function=self.embeddings,
             collection_name="degreepath_knowledge"
         )
-        self.indexed_ids = set()
+        # Seed from the persisted collection so restarts skip documents already stored
+        existing = self.vector_store._collection.get(include=[])
+        self.indexed_ids = set(existing["ids"])
+    
+    @staticmethod
+    def _detect_device() -> str:
+        """Pick the fastest available torch device for the embedding model."""
+        try:
+            import torch
+            if torch.cuda.is_available():
+                return "cuda"
+            if torch.backends.mps.is_available():
+                return "mps"
+        except Exception:
+            pass
+        return "cpu"
+    
+    @staticmethod
+    def _configure_torch_threads():
+        """Let torch kernels use every core instead of its conservative default."""
+        try:
+            import torch
+            torch.set_num_threads(os.cpu_count() or 1)
+        except Exception:
+            pass
     
     def _generate_doc_id(self, content: str, metadata: Dict[str, Any]) -> str:
         """Generate unique ID for document based on content and metadata."""
         key = f"{metadata.get('unit_code', '')}:{metadata.get('type', '')}:{content[:100]}"
-        return hashlib.md5(key.encode()).hexdigest()
+        # MD5 is kept so ids stay stable for documents already persisted in Chroma
+        return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
     
     def _expand_query(self, query: str) -> str:
         """Expand abbreviations in query."""
-        query_lower = query.lower()
-        for abbrev, full in QUERY_EXPANSIONS.items():
-            if abbrev in query_lower:
-                query = query.replace(abbrev, full)
-                query = query.replace(abbrev.upper(), full)
-        return query
+        return QUERY_EXPANSION_RE.sub(lambda m: QUERY_EXPANSIONS[m.group(1).lower()], query)
     
-    def _normalize_score(self, distance: float) -> float:
-        """Convert ChromaDB distance to similarity percentage (0-100)."""
-        clamped = min(distance, 2.0)
-        similarity = max(0, 100 * (1 - clamped / 2.0))
-        return round(similarity, 2)
+    def _normalize_scores(self, distances: Sequence[float]) -> List[float]:
+        """Convert ChromaDB distances to similarity percentages (0-100) in one vectorized pass."""
+        clamped = np.minimum(np.asarray(distances, dtype=float), 2.0)
+        similarity = np.maximum(0, 100 * (1 - clamped / 2.0))
+        return np.round(similarity, 2).tolist()
+
+    async def ingest_all(self):
+        """Ingest units, skills and materials concurrently."""
+        # indexed_ids needs no lock: each check-and-add runs without an await in between
+        await asyncio.gather(
+            self.ingest_units(),
+            self.ingest_skills(),
+            self.ingest_materials()
+        )
+
+    @staticmethod
+    def _unit_description_text(unit_code: str, unit: Dict[str, Any]) -> str:
+        """Build the searchable description document for a unit."""
+        prereq_list = unit.get('prerequisites', [])
+        prereq_text = ', '.join(prereq_list) if prereq_list else unit.get('raw_prerequisites', 'None')
+        return f"Unit Code: {unit_code}\nTitle: {unit['title']}\nDescription: {unit['description']}\nPrerequisites: {prereq_text}\nCredit Points: {unit.get('credit_points', 'N/A')}"
 
     async def ingest_units(self):
         """Ingest units from database into vector store."""
         units = get_all_units()
-        documents = []
-
-        for unit_code, unit in units.items():
-            prereq_list = unit.get('prerequisites', [])
-            prereq_text = ', '.join(prereq_list) if prereq_list else unit.get('raw_prerequisites', 'None')
-            desc_text = f"Unit Code: {unit_code}\nTitle: {unit['title']}\nDescription: {unit['description']}\nPrerequisites: {prereq_text}\nCredit Points: {unit.get('credit_points', 'N/A')}"
-            
-            metadata = {"source": "unit_guide", "type": "description", "unit_code": unit_code}
-            doc_id = self._generate_doc_id(desc_text, metadata)
-            
-            if doc_id not in self.indexed_ids:
-                documents.append(Document(
-                    page_content=desc_text,
-                    metadata=metadata,
-                    id=doc_id
-                ))
-                self.indexed_ids.add(doc_id)
-
-            for i, outcome in enumerate(unit.get('learning_outcomes', [])):
-                lo_text = f"Unit Code: {unit_code}\nLearning Outcome {i+1}: {outcome}"
-                lo_metadata = {"source": "unit_guide", "type": "learning_outcome", "unit_code": unit_code, "outcome_index": i}
-                lo_id = self._generate_doc_id(lo_text, lo_metadata)
-                
-                if lo_id not in self.indexed_ids:
-                    documents.append(Document(
-                        page_content=lo_text,
-                        metadata=lo_metadata,
-                        id=lo_id
-                    ))
-                    self.indexed_ids.add(lo_id)
+        
+        entries = [
+            (self._unit_description_text(unit_code, unit),
+             {"source": "unit_guide", "type": "description", "unit_code": unit_code})
+            for unit_code, unit in units.items()
+        ]
+        entries.extend(
+            (f"Unit Code: {unit_code}\nLearning Outcome {i+1}: {outcome}",
+             {"source": "unit_guide", "type": "learning_outcome", "unit_code": unit_code, "outcome_index": i})
+            for unit_code, unit in units.items()
+            for i, outcome in enumerate(unit.get('learning_outcomes', []))
+        )
+        
+        # Keyed by id so a repeated document is only written once
+        indexed = self.indexed_ids
+        new_entries = {
+            doc_id: entry
+            for doc_id, entry in zip((self._generate_doc_id(text, metadata) for text, metadata in entries), entries)
+            if doc_id not in indexed
+        }
+        indexed.update(new_entries)
+        
+        documents = [
+            Document(page_content=text, metadata=metadata, id=doc_id)
+            for doc_id, (text, metadata) in new_entries.items()
+        ]
 
         if documents:
             await self._add_documents_async(documents)
@@ -151,9 +203,52 @@ class RAGSystem:
             await self._add_documents_async(documents)
 
     async def _add_documents_async(self, documents: List[Document]):
-        """Add documents to vector store asynchronously."""
+        """
+        Embed documents in batches and write them to the collection asynchronously.
+        
+        Documents are sorted by length so each forward pass pads its texts to a
+        similar length. Writing batch N overlaps with embedding batch N+1.
+        """
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self.vector_store.add_documents, documents)
+        by_length = sorted(documents, key=lambda doc: len(doc.page_content))
+        pending_write: Optional[asyncio.Future] = None
+        
+        try:
+            for start in range(0, len(by_length), INGEST_BATCH_SIZE):
+                batch = by_length[start:start + INGEST_BATCH_SIZE]
+                texts = [doc.page_content for doc in batch]
+                embeddings = await loop.run_in_executor(self._exec, self.embeddings.embed_documents, texts)
+                
+                if pending_write:
+                    await pending_write
+                pending_write = loop.run_in_executor(
+                    self._exec, self._write_batch, batch, texts, embeddings
+                )
+            
+            if pending_write:
+                await pending_write
+                pending_write = None
+        finally:
+            if pending_write and not pending_write.done():
+                pending_write.cancel()
+
+    def _write_batch(self, batch: List[Document], texts: List[str], embeddings: List[List[float]]):
+        """Upsert one batch of documents with precomputed embeddings."""
+        self.vector_store._collection.upsert(
+            ids=[doc.id for doc in batch],
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=[doc.metadata for doc in batch]
+        )
+
+    def _search_collection(self, query_text: str, n_results: int, where: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Query the Chroma collection directly, skipping LangChain's Document wrapping."""
+        return self.vector_store._collection.query(
+            query_embeddings=[self.embeddings.embed_query(query_text)],
+            n_results=n_results,
+            where=where,
+            include=["documents", "metadatas", "distances"]
+        )
 
     async def query(
         self, 
@@ -175,42 +270,37 @@ class RAGSystem:
         """
         expanded_query = self._expand_query(query_text)
         
-        where_filter = {}
-        if filter_source:
-            where_filter["source"] = filter_source
-        if filter_type:
-            where_filter["type"] = filter_type
-        if filter_unit_code:
-            where_filter["unit_code"] = filter_unit_code
+        conditions = [
+            {field: value}
+            for field, value in (("source", filter_source), ("type", filter_type), ("unit_code", filter_unit_code))
+            if value
+        ]
+        # Chroma filters server-side; more than one condition has to be combined explicitly
+        if len(conditions) > 1:
+            where_filter = {"$and": conditions}
+        else:
+            where_filter = conditions[0] if conditions else None
         
         loop = asyncio.get_running_loop()
-        
-        if where_filter:
-            results = await loop.run_in_executor(
-                None,
-                lambda: self.vector_store.similarity_search_with_score(
-                    expanded_query, k=k * 2, filter=where_filter
-                )
-            )
-        else:
-            results = await loop.run_in_executor(
-                None, 
-                lambda: self.vector_store.similarity_search_with_score(expanded_query, k=k * 2)
-            )
+        results = await loop.run_in_executor(
+            self._exec, self._search_collection, expanded_query, k * 2, where_filter
+        )
         
         seen_content = set()
         formatted_results = []
+        similarities = self._normalize_scores(results["distances"][0])
         
-        for doc, distance in results:
-            content_hash = hashlib.md5(doc.page_content.encode()).hexdigest()
-            
-            if content_hash not in seen_content:
-                seen_content.add(content_hash)
+        for content, metadata, distance, similarity in zip(
+            results["documents"][0], results["metadatas"][0], results["distances"][0], similarities
+        ):
+            # Ids are unique per collection; identical text can still be stored under several ids
+            if content not in seen_content:
+                seen_content.add(content)
                 formatted_results.append({
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
+                    "content": content,
+                    "metadata": metadata,
                     "distance": round(distance, 4),
-                    "similarity_percent": self._normalize_score(distance)
+                    "similarity_percent": similarity
                 })
             
             if len(formatted_results) >= k:
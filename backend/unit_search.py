@@ -4,85 +4,271 @@ Fetches unit information from Macquarie University unit guides.
 Extracts unit code, title, description, prerequisites, and learning outcomes.
 """
 
+import os
 import re
+import json
 import time
-from dataclasses import dataclass
-from typing import Dict, Any, Optional, List
+import asyncio
+import sqlite3
+import sys
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, List, Tuple
 
-import requests
+import httpx
+import requests_cache
 from bs4 import BeautifulSoup
 
 
 BASE_URL = "https://unitguides.mq.edu.au"
 HANDBOOK_URL = "https://handbook.mq.edu.au"
+DEPT_LISTING_URL = f"{BASE_URL}/units/show_year/2025/School%20of%20Computing"
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
 
+# Concurrent page fetches allowed in search_units
+MAX_CONCURRENT_FETCHES = 10
 
-@dataclass
+# Unit guides change about once a year, so page fetches are cached on disk
+HTTP_CACHE_PATH = os.path.join(os.path.dirname(__file__), "data", "http_cache")
+HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", "86400"))
+# Parsed units are kept across restarts too, so a warm start skips both fetch and parse
+UNIT_CACHE_PATH = os.path.join(os.path.dirname(__file__), "data", "unit_cache.sqlite")
+UNIT_CACHE_TTL = int(os.getenv("UNIT_CACHE_TTL", str(HTTP_CACHE_TTL)))
+
+UNIT_CODE_RE = re.compile(r"[A-Z]{4}\d{4}")
+HEADING_TITLE_RE = re.compile(r"([A-Z]{4}\d{4})\s*[–\-—]\s*(.*)")
+PAGE_TITLE_RE = re.compile(r"([A-Z]{4}\d{4})\s*[–\-—]\s*(.*?)(?:\||$)")
+GENERAL_INFO_RE = re.compile(r"General\s+Information", re.I)
+LEARNING_OUTCOMES_RE = re.compile(r"Learning\s+Outcomes?", re.I)
+DESCRIPTION_CLASS_RE = re.compile(r'description|overview', re.I)
+PREREQ_WORD_RE = re.compile(r"prerequisite", re.I)
+PREREQ_SECTION_RE = re.compile(
+    r'Prerequisites\s*\n*\s*Prerequisites?\s*\n*\s*(.*?)(?:Corequisites|Co-requisites|Co-badged|Assessment|$)',
+    re.IGNORECASE | re.DOTALL
+)
+PREREQ_SIMPLE_RE = re.compile(
+    r'(?:Prerequisite[s]?|Pre-requisite[s]?)\s*[:]?\s*([A-Z]{4}\d{4}(?:\s*(?:and|or|,)\s*[A-Z]{4}\d{4})*)',
+    re.IGNORECASE
+)
+ADMISSION_RE = re.compile(r'(?:Admission\s+to|Enrolment\s+in)\s+([^\.]+)', re.IGNORECASE)
+COREQ_SECTION_RE = re.compile(
+    r'Corequisites\s*\n*\s*Corequisites?\s*\n*\s*(.*?)(?:Co-badged|Assessment|Incompatible|$)',
+    re.IGNORECASE | re.DOTALL
+)
+COREQ_SIMPLE_RE = re.compile(
+    r'(?:Corequisite[s]?|Co-requisite[s]?)\s*[:]?\s*([A-Z]{4}\d{4}(?:\s*(?:and|or|,)\s*[A-Z]{4}\d{4})*)',
+    re.IGNORECASE
+)
+CREDIT_POINTS_RE = re.compile(r'Credit\s*Points?\s*[:\-]?\s*(\d+)', re.IGNORECASE)
+CP_SUFFIX_RE = re.compile(r'(\d+)\s*cp\b', re.IGNORECASE)
+OFFERING_PERIOD_RE = re.compile(r"(S[1-2]\s*\d{4}|Session\s*[1-2]\s*\d{4}|Semester\s*[1-2]\s*\d{4})", re.IGNORECASE)
+
+
+@dataclass(slots=True, frozen=True)
 class UnitInfo:
-    """Structured unit information."""
+    """
+    Structured unit information. Immutable and hashable: list fields are stored as
+    tuples, so cached instances can be shared safely.
+    """
     unit_code: str
     title: str
     description: str
     credit_points: int
     year_level: int
-    prerequisites: List[str]
-    corequisites: List[str]
+    prerequisites: Tuple[str, ...]
+    corequisites: Tuple[str, ...]
     raw_prerequisites: str
     raw_corequisites: str
-    learning_outcomes: List[str]
+    learning_outcomes: Tuple[str, ...]
     offering_period: str
     source_url: str
+    
+    def __post_init__(self):
+        # Parsers and the JSON unit cache pass lists
+        for name in ("prerequisites", "corequisites", "learning_outcomes"):
+            object.__setattr__(self, name, tuple(getattr(self, name)))
 
 
 class UnitSearcher:
     """Search and fetch unit information from Macquarie University."""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        self._cache: Dict[str, UnitInfo] = {}
+        # The HTTP session and the unit cache database are opened on first use, not at import
+        self._session: Optional[requests_cache.CachedSession] = None
+        self._session_lock = threading.Lock()
+        # unit code -> (stored_at, unit info); entries expire after UNIT_CACHE_TTL like the on-disk ones
+        self._cache: Dict[str, Tuple[int, UnitInfo]] = {}
+        
+        # search_unit is called from worker threads, so the connection is shared under a lock
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+    
+    @property
+    def session(self) -> requests_cache.CachedSession:
+        """Disk-cached HTTP session, created on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    os.makedirs(os.path.dirname(HTTP_CACHE_PATH), exist_ok=True)
+                    session = requests_cache.CachedSession(
+                        HTTP_CACHE_PATH,
+                        backend='sqlite',
+                        expire_after=HTTP_CACHE_TTL,
+                        stale_if_error=True
+                    )
+                    session.headers.update(HEADERS)
+                    self._session = session
+        return self._session
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Unit cache connection, opened on first use. Call with _db_lock held."""
+        if self._db is None:
+            os.makedirs(os.path.dirname(UNIT_CACHE_PATH), exist_ok=True)
+            db = sqlite3.connect(UNIT_CACHE_PATH, check_same_thread=False)
+            db.execute("CREATE TABLE IF NOT EXISTS units (code TEXT PRIMARY KEY, json TEXT, ts INTEGER)")
+            db.commit()
+            self._db = db
+        return self._db
+    
+    def _get_cached(self, unit_code: str) -> Optional[UnitInfo]:
+        """Look a unit up in memory, then in the on-disk cache."""
+        oldest = int(time.time()) - UNIT_CACHE_TTL
+        cached = self._cache.get(unit_code)
+        if cached:
+            if cached[0] >= oldest:
+                return cached[1]
+            self._cache.pop(unit_code, None)
+        
+        with self._db_lock:
+            row = self._connection().execute(
+                "SELECT json, ts FROM units WHERE code = ? AND ts >= ?",
+                (unit_code, oldest)
+            ).fetchone()
+        
+        if not row:
+            return None
+        
+        unit_info = UnitInfo(**json.loads(row[0]))
+        # Keep the on-disk timestamp so a reloaded unit does not get a fresh TTL
+        self._cache[unit_code] = (row[1], unit_info)
+        return unit_info
+    
+    def _store_cached(self, unit_code: str, unit_info: UnitInfo):
+        """Remember a unit in memory and on disk."""
+        now = int(time.time())
+        self._cache[unit_code] = (now, unit_info)
+        
+        try:
+            with self._db_lock:
+                db = self._connection()
+                db.execute(
+                    "INSERT OR REPLACE INTO units (code, json, ts) VALUES (?, ?, ?)",
+                    (unit_code, json.dumps(asdict(unit_info)), now)
+                )
+                db.commit()
+        except sqlite3.Error as e:
+            print(f"[WARNING] Could not persist {unit_code} to unit cache: {e}")
     
     def search_unit(self, unit_code: str) -> Optional[UnitInfo]:
         """Search for a unit by code. Returns structured unit information."""
-        unit_code = unit_code.upper().strip()
+        unit_code = sys.intern(unit_code.upper().strip())
         
-        if unit_code in self._cache:
-            return self._cache[unit_code]
+        cached = self._get_cached(unit_code)
+        if cached:
+            return cached
         
         unit_info = self._search_department_listing(unit_code)
         
         if unit_info:
-            self._cache[unit_code] = unit_info
+            self._store_cached(unit_code, unit_info)
             return unit_info
         
         unit_info = self._search_handbook(unit_code)
         
         if unit_info:
-            self._cache[unit_code] = unit_info
+            self._store_cached(unit_code, unit_info)
             
         return unit_info
     
+    async def search_units(self, unit_codes: List[str]) -> Dict[str, Optional[UnitInfo]]:
+        """
+        Search for several units concurrently.
+        Returns a dict mapping each unit code to its information, or None if not found.
+        """
+        codes = list(dict.fromkeys(sys.intern(code.upper().strip()) for code in unit_codes))
+        results: Dict[str, Optional[UnitInfo]] = {}
+        for code in codes:
+            cached = self._get_cached(code)
+            if cached:
+                results[code] = cached
+        pending = [code for code in codes if code not in results]
+        
+        if not pending:
+            return results
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        async with httpx.AsyncClient(headers=HEADERS, timeout=15, follow_redirects=True) as client:
+            listing = await self._fetch_async(client, semaphore, DEPT_LISTING_URL)
+            unit_links = self._index_unit_links(listing) if listing else {}
+            found = await asyncio.gather(*(
+                self._search_unit_async(client, semaphore, code, unit_links.get(code))
+                for code in pending
+            ))
+        
+        for code, unit_info in zip(pending, found):
+            if unit_info:
+                self._store_cached(code, unit_info)
+            results[code] = unit_info
+        
+        return {code: results[code] for code in codes}
+    
+    async def _fetch_async(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, url: str) -> Optional[bytes]:
+        """Fetch a page, returning its body or None on failure."""
+        async with semaphore:
+            try:
+                response = await client.get(url)
+            except httpx.HTTPError:
+                return None
+        
+        return response.content if response.status_code == 200 else None
+    
+    async def _search_unit_async(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        unit_code: str,
+        unit_link: Optional[str]
+    ) -> Optional[UnitInfo]:
+        """Async counterpart of search_unit: unit guide first, then the handbook."""
+        try:
+            if unit_link:
+                content = await self._fetch_async(client, semaphore, unit_link)
+                if content:
+                    unit_info = await asyncio.to_thread(self._parse_unit_guide, content, unit_link, unit_code)
+                    if unit_info:
+                        return unit_info
+            
+            handbook_url = f"{HANDBOOK_URL}/2025/units/{unit_code}"
+            content = await self._fetch_async(client, semaphore, handbook_url)
+            if content:
+                return await asyncio.to_thread(self._parse_handbook, content, handbook_url, unit_code)
+            
+            return None
+            
+        except Exception:
+            return None
+    
     def _search_department_listing(self, unit_code: str) -> Optional[UnitInfo]:
         """Search department listing page for the unit."""
         try:
-            dept_url = f"{BASE_URL}/units/show_year/2025/School%20of%20Computing"
-            response = self.session.get(dept_url, timeout=15)
+            response = self.session.get(DEPT_LISTING_URL, timeout=15)
             
             if response.status_code != 200:
                 return None
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            unit_link = None
-            for a in soup.find_all('a', href=True):
-                text = a.get_text(strip=True)
-                href = a['href']
-                
-                if unit_code in text and '/unit_offerings/' in href and '/unit_guide' in href:
-                    unit_link = href if href.startswith('http') else BASE_URL + href
-                    break
+            unit_link = self._index_unit_links(response.content).get(unit_code)
             
             if not unit_link:
                 return None
@@ -92,6 +278,21 @@ class UnitSearcher:
         except Exception:
             return None
     
+    def _index_unit_links(self, content: bytes) -> Dict[str, str]:
+        """Map each unit code on the department listing to its unit guide URL."""
+        soup = BeautifulSoup(content, 'lxml')
+        
+        unit_links: Dict[str, str] = {}
+        for a in soup.find_all('a', href=True):
+            href = a['href']
+            
+            if '/unit_offerings/' in href and '/unit_guide' in href:
+                link = href if href.startswith('http') else BASE_URL + href
+                for code in UNIT_CODE_RE.findall(a.get_text(strip=True)):
+                    unit_links.setdefault(code, link)
+        
+        return unit_links
+    
     def _scrape_unit_guide(self, url: str, expected_code: str) -> Optional[UnitInfo]:
         """Scrape detailed unit information from a unit guide page."""
         try:
@@ -100,63 +301,69 @@ class UnitSearcher:
             if response.status_code != 200:
                 return None
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            unit_code = None
-            title = None
-            
-            for h1 in soup.find_all('h1'):
-                text = h1.get_text(strip=True)
-                match = re.search(r"([A-Z]{4}\d{4})\s*[–\-—]\s*(.*)", text)
-                if match:
-                    unit_code = match.group(1)
-                    title = match.group(2).strip()
-                    break
-            
-            if not unit_code:
-                unit_code = expected_code
-                title_tag = soup.find('title')
-                if title_tag:
-                    title_text = title_tag.get_text()
-                    match = re.search(r"([A-Z]{4}\d{4})\s*[–\-—]\s*(.*?)(?:\||$)", title_text)
-                    if match:
-                        title = match.group(2).strip()
-            
-            if not title:
-                title = f"Unit {unit_code}"
-            
-            description = self._extract_description(soup)
-            prereqs, raw_prereqs = self._extract_prerequisites(soup)
-            coreqs, raw_coreqs = self._extract_corequisites(soup)
-            outcomes = self._extract_learning_outcomes(soup)
-            credit_points = self._extract_credit_points(soup)
-            offering = self._extract_offering_period(soup)
-            year_level = int(unit_code[4]) if len(unit_code) > 4 and unit_code[4].isdigit() else 1
-            
-            return UnitInfo(
-                unit_code=unit_code,
-                title=title,
-                description=description,
-                credit_points=credit_points,
-                year_level=year_level,
-                prerequisites=prereqs,
-                corequisites=coreqs,
-                raw_prerequisites=raw_prereqs,
-                raw_corequisites=raw_coreqs,
-                learning_outcomes=outcomes,
-                offering_period=offering,
-                source_url=url
-            )
+            return self._parse_unit_guide(response.content, url, expected_code)
             
         except Exception:
             return None
     
+    def _parse_unit_guide(self, content: bytes, url: str, expected_code: str) -> UnitInfo:
+        """Parse a unit guide page into structured unit information."""
+        soup = BeautifulSoup(content, 'lxml')
+        # Walk the DOM once; the text-based extractors all search this string
+        body_text = soup.get_text()
+        
+        unit_code = None
+        title = None
+        
+        for h1 in soup.find_all('h1'):
+            text = h1.get_text(strip=True)
+            match = HEADING_TITLE_RE.search(text)
+            if match:
+                unit_code = sys.intern(match.group(1))
+                title = match.group(2).strip()
+                break
+        
+        if not unit_code:
+            unit_code = expected_code
+            title_tag = soup.find('title')
+            if title_tag:
+                title_text = title_tag.get_text()
+                match = PAGE_TITLE_RE.search(title_text)
+                if match:
+                    title = match.group(2).strip()
+        
+        if not title:
+            title = f"Unit {unit_code}"
+        
+        description = self._extract_description(soup)
+        prereqs, raw_prereqs = self._extract_prerequisites(body_text)
+        coreqs, raw_coreqs = self._extract_corequisites(body_text)
+        outcomes = self._extract_learning_outcomes(soup)
+        credit_points = self._extract_credit_points(body_text)
+        offering = self._extract_offering_period(body_text)
+        year_level = int(unit_code[4]) if len(unit_code) > 4 and unit_code[4].isdigit() else 1
+        
+        return UnitInfo(
+            unit_code=unit_code,
+            title=title,
+            description=description,
+            credit_points=credit_points,
+            year_level=year_level,
+            prerequisites=prereqs,
+            corequisites=coreqs,
+            raw_prerequisites=raw_prereqs,
+            raw_corequisites=raw_coreqs,
+            learning_outcomes=outcomes,
+            offering_period=offering,
+            source_url=url
+        )
+    
     def _extract_description(self, soup: BeautifulSoup) -> str:
         """Extract unit description"""
         description = ""
         
         # Look for "General Information" section
-        gen_info = soup.find('h2', string=re.compile(r"General\s+Information", re.I))
+        gen_info = soup.find('h2', string=GENERAL_INFO_RE)
         if gen_info:
             content_parts = []
             curr = gen_info.next_sibling
@@ -171,13 +378,11 @@ class UnitSearcher:
         
         # Try to find description in a div with class containing 'description' or 'overview'
         if not description or len(description) < 50:
-            for div in soup.find_all('div'):
-                div_class = ' '.join(div.get('class', []))
-                if 'description' in div_class.lower() or 'overview' in div_class.lower():
-                    text = div.get_text(strip=True)
-                    if len(text) > 50 and 'Download as PDF' not in text:
-                        description = text
-                        break
+            for div in soup.select('div[class*=description i], div[class*=overview i]'):
+                text = div.get_text(strip=True)
+                if len(text) > 50 and 'Download as PDF' not in text:
+                    description = text
+                    break
         
         # Try to find any paragraph that looks like a description
         if not description or len(description) < 50:
@@ -198,47 +403,33 @@ class UnitSearcher:
         
         return description[:1000] if description else "No description available"
     
-    def _extract_prerequisites(self, soup: BeautifulSoup) -> tuple:
+    def _extract_prerequisites(self, body_text: str) -> tuple:
         """Extract prerequisites - returns (list of codes, raw text)"""
         prereq_codes = []
         raw_text = ""
         
-        body_text = soup.get_text()
-        
         # Method 1: Look for Prerequisites section followed by unit codes
         # The pattern is: "Prerequisites" then possibly more text, then unit codes like COMP1010
-        prereq_section = re.search(
-            r'Prerequisites\s*\n*\s*Prerequisites?\s*\n*\s*(.*?)(?:Corequisites|Co-requisites|Co-badged|Assessment|$)',
-            body_text,
-            re.IGNORECASE | re.DOTALL
-        )
+        prereq_section = PREREQ_SECTION_RE.search(body_text)
         
         if prereq_section:
             section_text = prereq_section.group(1).strip()
             # Extract all unit codes from this section
-            codes = re.findall(r'[A-Z]{4}\d{4}', section_text)
+            codes = UNIT_CODE_RE.findall(section_text)
             prereq_codes.extend(codes)
             raw_text = section_text[:500]
         
         # Method 2: Also check for simpler patterns
         if not prereq_codes:
-            simple_match = re.search(
-                r'(?:Prerequisite[s]?|Pre-requisite[s]?)\s*[:]?\s*([A-Z]{4}\d{4}(?:\s*(?:and|or|,)\s*[A-Z]{4}\d{4})*)',
-                body_text,
-                re.IGNORECASE
-            )
+            simple_match = PREREQ_SIMPLE_RE.search(body_text)
             if simple_match:
                 raw_text = simple_match.group(1)
-                codes = re.findall(r'[A-Z]{4}\d{4}', raw_text)
+                codes = UNIT_CODE_RE.findall(raw_text)
                 prereq_codes.extend(codes)
         
         # Method 3: Look for "Admission to" or "Enrolment in" patterns (for postgrad units)
         if not prereq_codes:
-            admission_match = re.search(
-                r'(?:Admission\s+to|Enrolment\s+in)\s+([^\.]+)',
-                body_text,
-                re.IGNORECASE
-            )
+            admission_match = ADMISSION_RE.search(body_text)
             if admission_match:
                 raw_text = admission_match.group(1).strip()[:200]
         
@@ -255,36 +446,26 @@ class UnitSearcher:
         
         return unique_codes, raw_text if raw_text else "None"
     
-    def _extract_corequisites(self, soup: BeautifulSoup) -> tuple:
+    def _extract_corequisites(self, body_text: str) -> tuple:
         """Extract corequisites - returns (list of codes, raw text)"""
         coreq_codes = []
         raw_text = ""
         
-        body_text = soup.get_text()
-        
         # Look for Corequisites section
-        coreq_section = re.search(
-            r'Corequisites\s*\n*\s*Corequisites?\s*\n*\s*(.*?)(?:Co-badged|Assessment|Incompatible|$)',
-            body_text,
-            re.IGNORECASE | re.DOTALL
-        )
+        coreq_section = COREQ_SECTION_RE.search(body_text)
         
         if coreq_section:
             section_text = coreq_section.group(1).strip()
-            codes = re.findall(r'[A-Z]{4}\d{4}', section_text)
+            codes = UNIT_CODE_RE.findall(section_text)
             coreq_codes.extend(codes)
             raw_text = section_text[:500]
         
         # Simple pattern fallback
         if not coreq_codes:
-            simple_match = re.search(
-                r'(?:Corequisite[s]?|Co-requisite[s]?)\s*[:]?\s*([A-Z]{4}\d{4}(?:\s*(?:and|or|,)\s*[A-Z]{4}\d{4})*)',
-                body_text,
-                re.IGNORECASE
-            )
+            simple_match = COREQ_SIMPLE_RE.search(body_text)
             if simple_match:
                 raw_text = simple_match.group(1)
-                codes = re.findall(r'[A-Z]{4}\d{4}', raw_text)
+                codes = UNIT_CODE_RE.findall(raw_text)
                 coreq_codes.extend(codes)
         
         # Clean up
@@ -296,34 +477,26 @@ class UnitSearcher:
         """Extract learning outcomes"""
         outcomes = []
         
-        lo_header = soup.find('h2', string=re.compile(r"Learning\s+Outcomes?", re.I))
+        lo_header = soup.find('h2', string=LEARNING_OUTCOMES_RE)
         if lo_header:
-            curr = lo_header.next_sibling
-            while curr and getattr(curr, 'name', None) != 'h2':
-                if getattr(curr, 'name', None) in ['ul', 'ol']:
-                    for li in curr.find_all('li'):
+            # Only element siblings up to the next section heading are candidates
+            for sibling in lo_header.find_next_siblings(['h2', 'ul', 'ol', 'div']):
+                if sibling.name == 'h2':
+                    break
+                outcome_list = sibling if sibling.name in ('ul', 'ol') else sibling.select_one('ul, ol')
+                if outcome_list:
+                    for li in outcome_list.select('li'):
                         text = li.get_text(strip=True)
                         if text:
                             outcomes.append(text)
                     break
-                elif getattr(curr, 'name', None) == 'div':
-                    ul = curr.find('ul') or curr.find('ol')
-                    if ul:
-                        for li in ul.find_all('li'):
-                            text = li.get_text(strip=True)
-                            if text:
-                                outcomes.append(text)
-                        break
-                curr = getattr(curr, 'next_sibling', None)
         
         return outcomes
     
-    def _extract_credit_points(self, soup: BeautifulSoup) -> int:
+    def _extract_credit_points(self, body_text: str) -> int:
         """Extract credit points"""
-        body_text = soup.get_text()
-        
         # Look for "Credit Points: 10" or similar patterns
-        match = re.search(r'Credit\s*Points?\s*[:\-]?\s*(\d+)', body_text, re.IGNORECASE)
+        match = CREDIT_POINTS_RE.search(body_text)
         if match:
             cp = int(match.group(1))
             # Sanity check - credit points should be reasonable (1-60)
@@ -331,7 +504,7 @@ class UnitSearcher:
                 return cp
         
         # Look for "10cp" or "10 cp" pattern
-        match = re.search(r'(\d+)\s*cp\b', body_text, re.IGNORECASE)
+        match = CP_SUFFIX_RE.search(body_text)
         if match:
             cp = int(match.group(1))
             if 1 <= cp <= 60:
@@ -339,12 +512,10 @@ class UnitSearcher:
         
         return 10  # Default for most MQ units
     
-    def _extract_offering_period(self, soup: BeautifulSoup) -> str:
+    def _extract_offering_period(self, body_text: str) -> str:
         """Extract offering period (e.g., S1 2025, S2 2025)"""
-        body_text = soup.get_text()
-        
         # Look for session patterns
-        match = re.search(r"(S[1-2]\s*\d{4}|Session\s*[1-2]\s*\d{4}|Semester\s*[1-2]\s*\d{4})", body_text, re.IGNORECASE)
+        match = OFFERING_PERIOD_RE.search(body_text)
         if match:
             return match.group(1)
         
@@ -360,65 +531,68 @@ class UnitSearcher:
             if response.status_code != 200:
                 return None
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract title
-            title_tag = soup.find('h1')
-            title = title_tag.get_text(strip=True) if title_tag else f"Unit {unit_code}"
-            
-            # Remove unit code from title if present
-            title = re.sub(rf"^{unit_code}\s*[–\-—]\s*", "", title)
-            
-            # Extract description
-            desc_section = soup.find('div', class_=re.compile(r'description|overview', re.I))
-            description = desc_section.get_text(strip=True) if desc_section else ""
-            
-            # Extract prerequisites
-            prereq_section = soup.find(string=re.compile(r"prerequisite", re.I))
-            prereqs = []
-            raw_prereqs = ""
-            if prereq_section:
-                parent = prereq_section.find_parent()
-                if parent:
-                    raw_prereqs = parent.get_text(strip=True)
-                    prereqs = re.findall(r"[A-Z]{4}\d{4}", raw_prereqs)
-            
-            year_level = int(unit_code[4]) if len(unit_code) > 4 and unit_code[4].isdigit() else 1
-            
-            return UnitInfo(
-                unit_code=unit_code,
-                title=title,
-                description=description[:1000],
-                credit_points=10,
-                year_level=year_level,
-                prerequisites=prereqs,
-                corequisites=[],
-                raw_prerequisites=raw_prereqs,
-                raw_corequisites="",
-                learning_outcomes=[],
-                offering_period="2025",
-                source_url=handbook_url
-            )
+            return self._parse_handbook(response.content, handbook_url, unit_code)
             
         except Exception as e:
             print(f"[ERROR] Handbook search failed: {e}")
             return None
     
+    def _parse_handbook(self, content: bytes, handbook_url: str, unit_code: str) -> UnitInfo:
+        """Parse a handbook unit page into structured unit information."""
+        soup = BeautifulSoup(content, 'lxml')
+        
+        # Extract title
+        title_tag = soup.find('h1')
+        title = title_tag.get_text(strip=True) if title_tag else f"Unit {unit_code}"
+        
+        # Remove unit code from title if present
+        title = re.sub(rf"^{unit_code}\s*[–\-—]\s*", "", title)
+        
+        # Extract description
+        desc_section = soup.find('div', class_=DESCRIPTION_CLASS_RE)
+        description = desc_section.get_text(strip=True) if desc_section else ""
+        
+        # Extract prerequisites
+        prereq_section = soup.find(string=PREREQ_WORD_RE)
+        prereqs = []
+        raw_prereqs = ""
+        if prereq_section:
+            parent = prereq_section.find_parent()
+            if parent:
+                raw_prereqs = parent.get_text(strip=True)
+                prereqs = UNIT_CODE_RE.findall(raw_prereqs)
+        
+        year_level = int(unit_code[4]) if len(unit_code) > 4 and unit_code[4].isdigit() else 1
+        
+        return UnitInfo(
+            unit_code=unit_code,
+            title=title,
+            description=description[:1000],
+            credit_points=10,
+            year_level=year_level,
+            prerequisites=prereqs,
+            corequisites=[],
+            raw_prerequisites=raw_prereqs,
+            raw_corequisites="",
+            learning_outcomes=[],
+            offering_period="2025",
+            source_url=handbook_url
+        )
+    
     def get_all_computing_units(self) -> List[str]:
         """Get list of all computing unit codes from the School of Computing"""
         try:
-            dept_url = f"{BASE_URL}/units/show_year/2025/School%20of%20Computing"
-            response = self.session.get(dept_url, timeout=15)
+            response = self.session.get(DEPT_LISTING_URL, timeout=15)
             
             if response.status_code != 200:
                 return []
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, 'lxml')
             
             unit_codes = set()
             for a in soup.find_all('a', href=True):
                 text = a.get_text(strip=True)
-                codes = re.findall(r"[A-Z]{4}\d{4}", text)
+                codes = UNIT_CODE_RE.findall(text)
                 unit_codes.update(codes)
             
             return sorted(list(unit_codes))
@@ -439,24 +613,38 @@ def search_unit(unit_code: str) -> Optional[Dict[str, Any]]:
     result = unit_searcher.search_unit(unit_code)
     
     if result:
-        return {
-            "unit_code": result.unit_code,
-            "title": result.title,
-            "description": result.description,
-            "credit_points": result.credit_points,
-            "year_level": result.year_level,
-            "prerequisites": result.prerequisites,
-            "corequisites": result.corequisites,
-            "raw_prerequisites": result.raw_prerequisites,
-            "raw_corequisites": result.raw_corequisites,
-            "learning_outcomes": result.learning_outcomes,
-            "offering_period": result.offering_period,
-            "source_url": result.source_url
-        }
+        return unit_info_to_dict(result)
     
     return None
 
 
+async def search_units(unit_codes: List[str]) -> List[Dict[str, Any]]:
+    """
+    Search for several units concurrently.
+    Returns dictionaries for the units found, in input order.
+    """
+    results = await unit_searcher.search_units(unit_codes)
+    return [unit_info_to_dict(result) for result in results.values() if result]
+
+
+def unit_info_to_dict(result: UnitInfo) -> Dict[str, Any]:
+    """Convert a UnitInfo into the dictionary returned by search_unit, with fresh lists the caller may modify."""
+    return {
+        "unit_code": result.unit_code,
+        "title": result.title,
+        "description": result.description,
+        "credit_points": result.credit_points,
+        "year_level": result.year_level,
+        "prerequisites": list(result.prerequisites),
+        "corequisites": list(result.corequisites),
+        "raw_prerequisites": result.raw_prerequisites,
+        "raw_corequisites": result.raw_corequisites,
+        "learning_outcomes": list(result.learning_outcomes),
+        "offering_period": result.offering_period,
+        "source_url": result.source_url
+    }
+
+
 if __name__ == "__main__":
     test_units = ["COMP1010", "COMP1000"]
     
@@ -6,14 +6,38 @@ Enhanced context tracking for better personalization
 """
 
 import os
+import mmap
 import sys
 import re
 import json
-from typing import Dict, Optional, List, Set
-import requests
+import uuid
+import shutil
+import hashlib
+import atexit
+import asyncio
+import threading
+import time
+from collections import deque, defaultdict
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from operator import attrgetter
+from typing import Dict, Optional, List, Set, Callable, IO, Tuple, AsyncIterator, Iterator
+import httpx
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Add backend to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
@@ -23,77 +47,432 @@ PART1_API_URL = os.getenv("PART1_API_URL", "http://127.0.0.1:8000")
 # Persistence directory
 PERSISTENCE_DIR = Path(__file__).parent / "data" / "conversations"
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Unit codes are matched case-insensitively and upper-cased afterwards
+UNIT_CODE_RE = re.compile(r'[A-Z]{4}\d{4}', re.IGNORECASE | re.ASCII)
+
+TOPIC_KEYWORDS = {
+    "prerequisites": ["prerequisite", "prereq", "require", "need to take"],
+    "enrollment": ["enroll", "register", "sign up"],
+    "study_tips": ["study", "prepare", "learn", "tips"],
+    "assignments": ["assignment", "project", "homework", "task"],
+    "difficulty": ["hard", "difficult", "struggle", "confused"],
+    "career": ["career", "job", "work", "industry"],
+    "schedule": ["schedule", "time", "plan", "week"],
+}
+# One scan finds every topic; the lookahead keeps substring semantics, so
+# "homework" still counts towards both assignments and career ("work")
+TOPIC_RE = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{topic}>{'|'.join(map(re.escape, keywords))})"
+        for topic, keywords in TOPIC_KEYWORDS.items()
+    ) + ")",
+    re.IGNORECASE
+)
+
+
+def _build_topic_automaton():
+    """Aho-Corasick automaton mapping every topic keyword to its topic"""
+    automaton = ahocorasick.Automaton()
+    for topic, keywords in TOPIC_KEYWORDS.items():
+        for keyword in keywords:
+            automaton.add_word(keyword, topic)
+    automaton.make_automaton()
+    return automaton
+
+
+# Preferred over TOPIC_RE when pyahocorasick is installed
+TOPIC_AUTOMATON = _build_topic_automaton() if ahocorasick else None
+
+
+def find_topics(content: str) -> List[str]:
+    """Topics whose keywords occur in the text, in order of first occurrence"""
+    if TOPIC_AUTOMATON:
+        return list(dict.fromkeys(topic for _, topic in TOPIC_AUTOMATON.iter(content.lower())))
+    return list(dict.fromkeys(match.lastgroup for match in TOPIC_RE.finditer(content)))
+
+# Shared HTTP pool for Part 1 and LM Studio
+HTTP_POOL_SIZE = 64
+HTTP_CONNECT_RETRIES = 2
+# Idle connections (e.g. the one warmed at startup) stay open this long
+HTTP_KEEPALIVE_EXPIRY = 300
+
+# Log appends are buffered and written with one fsync per file every
+# FLUSH_INTERVAL seconds, or sooner once FLUSH_MAX_BYTES are pending
+FLUSH_INTERVAL = 0.25
+FLUSH_MAX_BYTES = 64 * 1024
+
+TUTOR_SYSTEM_PROMPT = (
+    "You are a helpful and knowledgeable university tutor. "
+    "You help students understand course material, plan their studies, "
+    "and answer questions about their units. "
+    "Use the student's profile and conversation history to provide "
+    "personalized, contextual advice. "
+    "Be encouraging, clear, and educational."
+)
+
+# Fallback intents in priority order; the first one matched picks the reply
+FALLBACK_KEYWORDS = {
+    "study": ["study", "learn", "prepare", "plan"],
+    "prereq": ["prerequisite", "prereq", "before", "first"],
+    "assignment": ["assignment", "homework", "project", "task"],
+    "explain": ["explain", "what is", "how does", "understand"],
+    "time": ["time", "week", "schedule", "manage"],
+    "difficulty": ["difficult", "hard", "struggle", "confused", "help"],
+}
+FALLBACK_RE = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{intent}>{'|'.join(map(re.escape, keywords))})"
+        for intent, keywords in FALLBACK_KEYWORDS.items()
+    ) + ")",
+    re.IGNORECASE
+)
+ELIGIBILITY_RE = re.compile(r'prereq|eligible|enroll', re.IGNORECASE)
+FALLBACK_REPLIES = {
+    "study": (
+        "For effective study, I recommend: "
+        "1) Review lecture notes within 24 hours of class. "
+        "2) Practice problems regularly, not just before exams. "
+        "3) Join study groups to discuss concepts. "
+        "4) Use office hours when you're stuck. "
+        "5) Start assignments early to allow time for help."
+    ),
+    "prereq": (
+        "Prerequisites are units you must complete before taking another unit. "
+        "Check your unit handbook or use the eligibility checker to verify requirements."
+    ),
+    "assignment": (
+        "For assignment help: "
+        "1) Read the specification carefully multiple times. "
+        "2) Break it into smaller tasks. "
+        "3) Start with what you know. "
+        "4) Use consultation hours for specific questions. "
+        "5) Don't leave it until the last minute!"
+    ),
+    "explain": (
+        "I'd be happy to explain! For complex concepts: "
+        "1) Start with the basics and build up. "
+        "2) Look for examples and practice problems. "
+        "3) Try explaining it to someone else. "
+        "4) Use multiple resources (textbook, videos, tutorials). "
+        "Could you be more specific about what you'd like to understand?"
+    ),
+    "time": (
+        "Good time management is key! "
+        "For a typical unit, allocate 8-10 hours per week: "
+        "- 3 hours for lectures/tutorials "
+        "- 2-3 hours reviewing notes "
+        "- 3-4 hours on assignments and practice. "
+        "Use a calendar and set specific study times."
+    ),
+    "difficulty": (
+        "Don't worry, many students find some topics challenging! "
+        "Here's what to do: "
+        "1) Identify exactly what you don't understand. "
+        "2) Review the basics first. "
+        "3) Attend consultation hours or ask in tutorials. "
+        "4) Form a study group. "
+        "5) Use online resources for different explanations. "
+        "What specific topic are you struggling with?"
+    ),
+}
+
+# Log line prefixes for message and clear records, as written by orjson or the json fallback
+MESSAGE_RECORD_PREFIXES = (b'{"type":"message",', b'{"type": "message", ')
+CLEAR_RECORD_LINES = (b'{"type":"clear"}', b'{"type": "clear"}')
+
+# Memory keeps a bounded window of recent messages; the full history stays in the log
+MAX_MEMORY_MESSAGES = 200
+MAX_MEMORY_CHARS = 40_000
+# Messages of history included in each prompt
+PROMPT_HISTORY_MESSAGES = 10
+# History messages longer than this are shown truncated in prompts
+HISTORY_DISPLAY_CHARS = 300
+
+# Pasted images and very long messages are moved to blob files so logs and prompts stay small
+DATA_URI_RE = re.compile(r'data:image/[^;,]+;base64,[A-Za-z0-9+/=]+')
+BLOB_MIN_CHARS = 4096
+BLOB_PREVIEW_CHARS = 1000
+# Student ids name log files and blob directories; the API validates them against this too
+STUDENT_ID_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+
+# Part 1 responses are reused across turns; students keep asking about the same units
+UNIT_CONTEXT_TTL = float(os.getenv("UNIT_CONTEXT_TTL", "600"))
+RAG_CONTEXT_TTL = float(os.getenv("RAG_CONTEXT_TTL", "300"))
+CONTEXT_CACHE_SIZE = 2048
+
+# Every log write ends with a summary record, so statistics only need a log's tail
+SUMMARY_TAIL_BYTES = 64 * 1024
+STATS_SCAN_WORKERS = 8
+
+
+def dumps(obj) -> bytes:
+    """Serialize to JSON bytes, using orjson when it is installed"""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def loads(data):
+    """Deserialize JSON from bytes or str, using orjson when it is installed"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _cache_get(cache: dict, key):
+    """Return a cached value if it has not expired"""
+    cached = cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+
+def _cache_put(cache: dict, key, value, ttl: float):
+    """Cache a value for ttl seconds, evicting the oldest entry when full"""
+    if len(cache) >= CONTEXT_CACHE_SIZE and key not in cache:
+        del cache[next(iter(cache))]
+    cache[key] = (time.monotonic() + ttl, value)
+
+
+def _blob_dir(student_id: Optional[str]) -> Path:
+    """Return the student's blob directory, rejecting ids that could escape the blobs root"""
+    if student_id is None:
+        return PERSISTENCE_DIR / "blobs" / "_anonymous"
+    if not STUDENT_ID_RE.fullmatch(student_id):
+        raise ValueError(f"Invalid student id: {student_id!r}")
+    return PERSISTENCE_DIR / "blobs" / student_id
+
+
+def _write_blob(student_id: Optional[str], data: str) -> str:
+    """Store a blob under the student's blob directory and return its id"""
+    blob_id = uuid.uuid4().hex
+    blob_dir = _blob_dir(student_id)
+    blob_dir.mkdir(parents=True, exist_ok=True)
+    (blob_dir / f"{blob_id}.bin").write_bytes(data.encode())
+    return blob_id
+
+
+def _strip_blobs(student_id: Optional[str], content: str):
+    """
+    Replace inline images with "[image N]" and oversized text with a preview plus a blob pointer.
+    Returns (content, blob ids).
+    """
+    blob_refs = []
+    
+    def stash_image(match):
+        blob_refs.append(_write_blob(student_id, match.group(0)))
+        return f"[image {len(blob_refs)}]"
+    
+    if "base64," in content:
+        content = DATA_URI_RE.sub(stash_image, content)
+    
+    if len(content) > BLOB_MIN_CHARS:
+        blob_id = _write_blob(student_id, content)
+        blob_refs.append(blob_id)
+        content = f"{content[:BLOB_PREVIEW_CHARS]}... [blob:{blob_id}]"
+    
+    return content, blob_refs
+
+
+def _scan_summary(file_path: Path) -> Optional[dict]:
+    """Read the latest summary record from the end of a conversation log"""
+    try:
+        with open(file_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - SUMMARY_TAIL_BYTES))
+            tail = f.read()
+    except OSError:
+        return None
+    
+    for line in reversed(tail.splitlines()):
+        try:
+            record = loads(line)
+        except ValueError:
+            continue  # partial first line of the tail, or a torn write
+        if record.get("type") == "summary":
+            return record
+    
+    return None
+
+
+def _iter_log_lines(file_path: Path) -> Iterator[bytes]:
+    """Yield the raw lines of a conversation log, reading it through a read-only mmap"""
+    with open(file_path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return  # empty file
+        
+        with mm:
+            size = len(mm)
+            start = 0
+            while start < size:
+                end = mm.find(b"\n", start)
+                if end == -1:
+                    end = size
+                yield mm[start:end]
+                start = end + 1
+
+
+def _iter_log_records(file_path: Path):
+    """Yield the decoded records of a conversation log"""
+    for line in _iter_log_lines(file_path):
+        try:
+            yield loads(line)
+        except ValueError:
+            pass  # blank or torn line from an interrupted write
+
+
+def _make_message(role: str, content: str, timestamp: str, extras: Optional[dict]) -> dict:
+    """Materialize a message dict from its stored columns"""
+    message = {"role": role, "content": content, "timestamp": timestamp}
+    if extras:
+        message.update(extras)
+    return message
+
 
 class ConversationMemory:
     """Enhanced conversation memory with topic tracking"""
     
     def __init__(self, student_id: str = None):
         self.student_id = student_id
-        self.messages: List[dict] = []
-        self.discussed_units: Set[str] = set()  # Track units discussed
-        self.discussed_topics: Set[str] = set()  # Track general topics
+        # Messages are stored column-wise in parallel bounded deques and only
+        # materialized as dicts when read
+        self._roles: deque = deque(maxlen=MAX_MEMORY_MESSAGES)
+        self._contents: deque = deque(maxlen=MAX_MEMORY_MESSAGES)
+        self._timestamps: deque = deque(maxlen=MAX_MEMORY_MESSAGES)
+        self._displays: deque = deque(maxlen=MAX_MEMORY_MESSAGES)  # truncated prompt text, or None
+        self._extras: deque = deque(maxlen=MAX_MEMORY_MESSAGES)  # other fields such as blob_refs, or None
+        self._total_chars = 0
+        # Messages since the last clear, including ones the bounded window has dropped
+        self.total_messages = 0
+        # Ordered lists for output, with sets alongside for O(1) dedupe
+        self.discussed_units: List[str] = []  # Track units discussed
+        self.discussed_topics: List[str] = []  # Track general topics
+        self._units_set: Set[str] = set()
+        self._topics_set: Set[str] = set()
         self.session_start = datetime.utcnow().isoformat()
         self.last_activity = datetime.utcnow().isoformat()
+        # Called with each new message so the owner can persist it
+        self.on_message: Optional[Callable[[dict], None]] = None
     
-    def add_message(self, role: str, content: str):
-        """Add a message to history and extract topics"""
-        self.messages.append({
+    def add_message(self, role: str, content: str, blob_refs: Optional[List[str]] = None):
+        """
+        Add a message to history and extract topics.
+        Pass blob_refs when content has already been through _strip_blobs.
+        """
+        if blob_refs is None:
+            content, blob_refs = _strip_blobs(self.student_id, content)
+        message = {
             "role": role,
             "content": content,
             "timestamp": datetime.utcnow().isoformat()
-        })
-        self.last_activity = datetime.utcnow().isoformat()
+        }
+        if blob_refs:
+            message["blob_refs"] = blob_refs
+        self.restore_message(message)
+        
+        if self.on_message:
+            self.on_message(message)
+    
+    def restore_message(self, message: dict):
+        """Append an already-timestamped message (e.g. replayed from disk) and extract topics"""
+        self._push(message)
+        self.last_activity = message["timestamp"]
+        content = message["content"]
         
         # Extract and track unit codes mentioned
-        unit_codes = re.findall(r'[A-Z]{4}\d{4}', content.upper())
-        self.discussed_units.update(unit_codes)
+        self.track_units(code.upper() for code in UNIT_CODE_RE.findall(content))
         
         # Track general topics
-        topic_keywords = {
-            "prerequisites": ["prerequisite", "prereq", "require", "need to take"],
-            "enrollment": ["enroll", "register", "sign up"],
-            "study_tips": ["study", "prepare", "learn", "tips"],
-            "assignments": ["assignment", "project", "homework", "task"],
-            "difficulty": ["hard", "difficult", "struggle", "confused"],
-            "career": ["career", "job", "work", "industry"],
-            "schedule": ["schedule", "time", "plan", "week"],
-        }
+        self.track_topics(find_topics(content))
+    
+    def _push(self, message: dict):
+        """Append a message, dropping the oldest ones beyond the count and size caps"""
+        content = message["content"]
+        if len(self._contents) == MAX_MEMORY_MESSAGES:
+            self._total_chars -= len(self._contents[0])
+        
+        self._roles.append(sys.intern(message["role"]))
+        self._contents.append(content)
+        self._timestamps.append(message.get("timestamp"))
+        # Truncated prompt text is computed once here instead of on every turn
+        self._displays.append(
+            content[:HISTORY_DISPLAY_CHARS] + "..." if len(content) > HISTORY_DISPLAY_CHARS else None
+        )
+        self._extras.append(
+            {k: v for k, v in message.items() if k not in ("role", "content", "timestamp")}
+            if len(message) > 3 else None
+        )
+        self._total_chars += len(content)
+        self.total_messages += 1
         
-        content_lower = content.lower()
-        for topic, keywords in topic_keywords.items():
-            if any(kw in content_lower for kw in keywords):
-                self.discussed_topics.add(topic)
+        while self._total_chars > MAX_MEMORY_CHARS and len(self._contents) > 1:
+            self._roles.popleft()
+            self._total_chars -= len(self._contents.popleft())
+            self._timestamps.popleft()
+            self._displays.popleft()
+            self._extras.popleft()
+    
+    def track_units(self, codes):
+        """Record unit codes as discussed, keeping first-mention order"""
+        for code in codes:
+            if code not in self._units_set:
+                self._units_set.add(code)
+                self.discussed_units.append(code)
+    
+    def track_topics(self, topics):
+        """Record topics as discussed, keeping first-mention order"""
+        for topic in topics:
+            if topic not in self._topics_set:
+                self._topics_set.add(topic)
+                self.discussed_topics.append(topic)
     
     def get_messages(self) -> List[dict]:
-        """Get all messages"""
-        return self.messages
+        """Get all messages held in memory"""
+        return list(map(_make_message, self._roles, self._contents, self._timestamps, self._extras))
     
-    def get_recent_messages(self, n: int = 10) -> List[dict]:
-        """Get last n messages"""
-        return self.messages[-n:] if len(self.messages) > n else self.messages
+    def get_recent_messages(self, n: int = PROMPT_HISTORY_MESSAGES) -> List[dict]:
+        """Get last n messages, with _display set on long ones for prompt building"""
+        columns = (self._roles, self._contents, self._timestamps, self._extras, self._displays)
+        recent = []
+        for role, content, timestamp, extras, display in islice(zip(*map(reversed, columns)), n):
+            message = _make_message(role, content, timestamp, extras)
+            if display:
+                message["_display"] = display
+            recent.append(message)
+        recent.reverse()
+        return recent
     
     def get_context_summary(self) -> dict:
         """Get a summary of conversation context"""
         return {
-            "total_messages": len(self.messages),
-            "discussed_units": list(self.discussed_units),
-            "discussed_topics": list(self.discussed_topics),
+            "total_messages": self.total_messages,
+            "discussed_units": self.discussed_units,
+            "discussed_topics": self.discussed_topics,
             "session_start": self.session_start,
             "last_activity": self.last_activity
         }
     
     def clear(self):
         """Clear all messages but keep topic history"""
-        self.messages = []
+        for column in (self._roles, self._contents, self._timestamps, self._displays, self._extras):
+            column.clear()
+        self._total_chars = 0
+        self.total_messages = 0
         # Keep discussed_units and discussed_topics for continuity
     
     def to_dict(self) -> dict:
         """Serialize to dictionary for persistence"""
         return {
             "student_id": self.student_id,
-            "messages": self.messages,
-            "discussed_units": list(self.discussed_units),
-            "discussed_topics": list(self.discussed_topics),
+            "messages": self.get_messages(),
+            "discussed_units": self.discussed_units,
+            "discussed_topics": self.discussed_topics,
             "session_start": self.session_start,
             "last_activity": self.last_activity
         }
@@ -102,9 +481,10 @@ class ConversationMemory:
     def from_dict(cls, data: dict) -> 'ConversationMemory':
         """Deserialize from dictionary"""
         memory = cls(student_id=data.get("student_id"))
-        memory.messages = data.get("messages", [])
-        memory.discussed_units = set(data.get("discussed_units", []))
-        memory.discussed_topics = set(data.get("discussed_topics", []))
+        for message in data.get("messages", []):
+            memory._push(message)
+        memory.track_units(data.get("discussed_units", []))
+        memory.track_topics(data.get("discussed_topics", []))
         memory.session_start = data.get("session_start", datetime.utcnow().isoformat())
         memory.last_activity = data.get("last_activity", datetime.utcnow().isoformat())
         return memory
@@ -113,7 +493,13 @@ class ConversationMemory:
 class StudentConversationManager:
     """Manages conversation context and memory for each student with persistence"""
     
-    def __init__(self, lm_studio_url: str, model_name: str, enabled: bool = True):
+    def __init__(
+        self,
+        lm_studio_url: str,
+        model_name: str,
+        enabled: bool = True,
+        lm_semaphore: Optional[asyncio.Semaphore] = None
+    ):
         """
         Initialize conversation manager
         
@@ -121,10 +507,35 @@ class StudentConversationManager:
             lm_studio_url: Base URL for LM Studio API
             model_name: Name of the model to use
             enabled: Whether LM Studio is enabled (fallback if False)
+            lm_semaphore: Optional semaphore shared with other LM Studio callers to bound concurrent requests
         """
         self.lm_studio_url = lm_studio_url
         self.model_name = model_name
         self.enabled = enabled
+        self._lm_semaphore = lm_semaphore or nullcontext()
+        
+        # Pooled keep-alive client for Part 1 API and LM Studio calls, sized for
+        # concurrent chats; connection failures are retried before giving up
+        self._http = httpx.AsyncClient(
+            base_url=PART1_API_URL,
+            timeout=10,
+            transport=httpx.AsyncHTTPTransport(
+                retries=HTTP_CONNECT_RETRIES,
+                limits=httpx.Limits(
+                    max_connections=HTTP_POOL_SIZE,
+                    max_keepalive_connections=16,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+                )
+            )
+        )
+        # Hash and JSON encoding of the last system message sent per student
+        self._prefix_cache: Dict[str, Tuple[bytes, bytes]] = {}
+        # Turns whose system message was unchanged, so LM Studio could reuse its KV cache
+        self._prefix_hits = 0
+        
+        # key -> (expires_at, value) for recent Part 1 responses
+        self._unit_cache: Dict[str, Tuple[float, dict]] = {}
+        self._rag_cache: Dict[bytes, Tuple[float, str]] = {}
         
         # Store conversation memory per student
         self.conversations: Dict[str, ConversationMemory] = {}
@@ -132,65 +543,215 @@ class StudentConversationManager:
         # Store student contexts (profile info)
         self.student_contexts: Dict[str, dict] = {}
         
+        # Open append handles for each student's conversation log, and the
+        # records waiting for the next group commit
+        self._log_files: Dict[str, IO] = {}
+        self._pending_writes: Dict[str, List[bytes]] = {}
+        self._pending_bytes = 0
+        # _write_lock only guards the queue; file writes happen under the
+        # student's own lock, so appends never wait behind another file's fsync
+        self._write_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._file_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        # One chat turn at a time per student; different students run concurrently
+        self._chat_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        
+        self._flusher = threading.Thread(target=self._flush_loop, name="conversation-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+        
         # Ensure persistence directory exists
         PERSISTENCE_DIR.mkdir(parents=True, exist_ok=True)
         
-        # Load existing conversations from disk
-        self._load_conversations()
+        # Saved conversations are only listed here; each is loaded on first use
+        self._known_ids: Set[str] = {
+            file_path.stem
+            for pattern in ("*.jsonl", "*.json")
+            for file_path in PERSISTENCE_DIR.glob(pattern)
+        }
     
-    def _load_conversations(self):
-        """Load saved conversations from disk"""
+    def _load_one(self, student_id: str):
+        """Load a student's saved conversation from disk, if it has not been loaded yet"""
+        if student_id in self.conversations or student_id not in self._known_ids:
+            return
+        
+        log_path = PERSISTENCE_DIR / f"{student_id}.jsonl"
         try:
-            for file_path in PERSISTENCE_DIR.glob("*.json"):
-                try:
-                    with open(file_path, "r") as f:
-                        data = json.load(f)
-                        student_id = data.get("student_id")
-                        if student_id:
-                            self.conversations[student_id] = ConversationMemory.from_dict(data.get("memory", {}))
-                            if data.get("context"):
-                                self.student_contexts[student_id] = data["context"]
-                            print(f"[LOADED] Conversation for {student_id}")
-                except Exception as e:
-                    print(f"[WARN] Failed to load {file_path}: {e}")
+            if log_path.exists():
+                self._load_log(log_path)
+            else:
+                # Conversations saved before the append-only log are converted on first load
+                self._load_legacy(PERSISTENCE_DIR / f"{student_id}.json")
+            print(f"[LOADED] Conversation for {student_id}")
         except Exception as e:
-            print(f"[WARN] Failed to load conversations: {e}")
+            print(f"[WARN] Failed to load conversation for {student_id}: {e}")
+    
+    def _load_log(self, file_path: Path):
+        """Replay a student's append-only conversation log"""
+        student_id = file_path.stem
+        memory = ConversationMemory(student_id=student_id)
+        
+        for record in _iter_log_records(file_path):
+            kind = record.pop("type", None)
+            if kind == "meta":
+                memory.session_start = record.get("session_start", memory.session_start)
+                memory.track_units(record.get("discussed_units", []))
+                memory.track_topics(record.get("discussed_topics", []))
+            elif kind == "message":
+                memory.restore_message(record)
+            elif kind == "context_update":
+                self.student_contexts[student_id] = record["context"]
+            elif kind == "clear":
+                memory.clear()
+        
+        self._register_memory(student_id, memory)
+    
+    def _load_legacy(self, file_path: Path):
+        """Load a whole-file JSON conversation and rewrite it as a log"""
+        with open(file_path, "rb") as f:
+            data = loads(f.read())
+        
+        student_id = data.get("student_id")
+        if not student_id:
+            return
+        
+        memory = ConversationMemory.from_dict(data.get("memory", {}))
+        memory.student_id = student_id
+        self._register_memory(student_id, memory)
+        
+        # The log keeps the full history even though memory only holds a window of it
+        for message in data.get("memory", {}).get("messages", []):
+            self._append_record(student_id, {"type": "message", **message})
+        if data.get("context"):
+            self.student_contexts[student_id] = data["context"]
+            self._append_record(student_id, {"type": "context_update", "context": data["context"]})
     
-    def _save_conversation(self, student_id: str):
-        """Save conversation to disk"""
+    def _register_memory(self, student_id: str, memory: ConversationMemory):
+        """Track a memory and persist every message added to it"""
+        memory.on_message = partial(self._log_message, student_id)
+        self.conversations[student_id] = memory
+    
+    def _log_message(self, student_id: str, message: dict):
+        self._append_record(student_id, {"type": "message", **message})
+    
+    def _summary_record(self, student_id: str) -> dict:
+        """Snapshot of the aggregate fields get_statistics needs for one student"""
+        memory = self.conversations.get(student_id)
+        return {
+            "type": "summary",
+            "total_messages": memory.total_messages if memory else 0,
+            "discussed_units": memory.discussed_units if memory else [],
+            "discussed_topics": memory.discussed_topics if memory else [],
+            "has_context": student_id in self.student_contexts
+        }
+    
+    def _append_record(self, student_id: str, record: dict):
+        """Queue one record, followed by a fresh summary, for the student's conversation log"""
         try:
-            file_path = PERSISTENCE_DIR / f"{student_id}.json"
-            data = {
-                "student_id": student_id,
-                "memory": self.conversations[student_id].to_dict() if student_id in self.conversations else {},
-                "context": self.student_contexts.get(student_id, {}),
-                "saved_at": datetime.utcnow().isoformat()
-            }
-            with open(file_path, "w") as f:
-                json.dump(data, f, indent=2)
+            data = dumps(record) + b"\n" + dumps(self._summary_record(student_id)) + b"\n"
+            
+            with self._write_lock:
+                if student_id not in self._log_files:
+                    log_file = open(PERSISTENCE_DIR / f"{student_id}.jsonl", "ab")
+                    self._log_files[student_id] = log_file
+                    
+                    # A new log starts with the memory's metadata
+                    if log_file.tell() == 0:
+                        memory = self.conversations.get(student_id)
+                        meta = {"type": "meta", "student_id": student_id}
+                        if memory:
+                            meta.update(
+                                session_start=memory.session_start,
+                                discussed_units=memory.discussed_units,
+                                discussed_topics=memory.discussed_topics
+                            )
+                        data = dumps(meta) + b"\n" + data
+                
+                self._pending_writes.setdefault(student_id, []).append(data)
+                self._pending_bytes += len(data)
+                flush_now = self._pending_bytes >= FLUSH_MAX_BYTES
+            
+            if flush_now:
+                self.flush()
         except Exception as e:
             print(f"[WARN] Failed to save conversation for {student_id}: {e}")
     
+    def _flush_loop(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            self.flush()
+    
+    def flush(self):
+        """Write all queued log records, with a single fsync per student file"""
+        with self._flush_lock:
+            with self._write_lock:
+                pending, self._pending_writes = self._pending_writes, {}
+                self._pending_bytes = 0
+            
+            for student_id, chunks in pending.items():
+                with self._file_locks[student_id]:
+                    log_file = self._log_files.get(student_id)
+                    if log_file is None:
+                        continue  # student deleted since the records were queued
+                    try:
+                        log_file.writelines(chunks)
+                        log_file.flush()
+                        os.fsync(log_file.fileno())
+                    except Exception as e:
+                        print(f"[WARN] Failed to save conversation for {student_id}: {e}")
+    
+    async def prewarm(self):
+        """Open a keep-alive connection to LM Studio with a 1-token completion, so the first chat skips connection setup"""
+        if not self.enabled:
+            return
+        try:
+            async with self._lm_semaphore:
+                await self._http.post(
+                    f"{self.lm_studio_url}/chat/completions",
+                    content=dumps({
+                        "model": self.model_name,
+                        "messages": [{"role": "user", "content": "ping"}],
+                        "max_tokens": 1
+                    }),
+                    headers=JSON_HEADERS,
+                    timeout=30
+                )
+        except httpx.HTTPError as e:
+            print(f"[WARN] LM Studio prewarm failed: {e}")
+    
+    async def aclose(self):
+        """Close pooled HTTP connections and write any queued log records"""
+        await self._http.aclose()
+        self.flush()
+    
     def get_or_create_memory(self, student_id: str) -> ConversationMemory:
         """Get or create conversation memory for a student"""
         if student_id not in self.conversations:
-            self.conversations[student_id] = ConversationMemory(student_id=student_id)
+            self._load_one(student_id)
+        if student_id not in self.conversations:
+            self._register_memory(student_id, ConversationMemory(student_id=student_id))
         return self.conversations[student_id]
     
     def set_student_context(self, student_id: str, context: dict):
         """Store student context for future reference"""
+        self._load_one(student_id)
+        current = self.student_contexts.get(student_id)
+        if current is not None and {k: v for k, v in current.items() if k != "context_set_at"} == context:
+            return  # same profile as last turn; nothing new to log
+        
         self.student_contexts[student_id] = {
             **context,
             "context_set_at": datetime.utcnow().isoformat()
         }
         # Persist changes
-        self._save_conversation(student_id)
+        self._append_record(student_id, {"type": "context_update", "context": self.student_contexts[student_id]})
     
     def get_student_context(self, student_id: str) -> Optional[dict]:
         """Get stored student context"""
+        self._load_one(student_id)
         return self.student_contexts.get(student_id)
     
-    def chat(
+    async def chat(
         self, 
         student_id: str, 
         message: str, 
@@ -208,153 +769,151 @@ class StudentConversationManager:
         Returns:
             AI tutor's response
         """
-        memory = self.get_or_create_memory(student_id)
-        
-        # Update student context if provided
-        if student_profile:
-            self.set_student_context(student_id, student_profile)
-        
-        # Fetch RAG context and live unit data for mentioned units
-        rag_context = self._fetch_rag_context(message)
-        live_unit_context = self._fetch_live_unit_context(message)
-        
-        # Also check for units from previous conversation
-        if memory.discussed_units:
-            for code in list(memory.discussed_units)[:2]:  # Add context for up to 2 previously discussed units
-                if code not in live_unit_context:
-                    try:
-                        response = requests.get(f"{PART1_API_URL}/unit/{code}", timeout=5)
-                        if response.status_code == 200:
-                            data = response.json()
-                            details = data.get("details", {})
-                            live_unit_context[code] = {
-                                "title": details.get("title", "Unknown"),
-                                "prerequisites": details.get("prerequisites", []),
-                                "credit_points": details.get("credit_points", 10),
-                                "learning_outcomes": details.get("learning_outcomes", [])[:3]
-                            }
-                    except:
-                        pass
-        
-        # Build context-aware prompt with RAG + Live data + Memory
-        prompt = self._build_prompt(
-            message, 
-            memory.get_messages(), 
-            student_profile,
-            rag_context=rag_context,
-            live_unit_context=live_unit_context,
-            memory=memory
-        )
-        
-        # Get response from LM Studio or fallback
-        print(f"[DEBUG] Chat enabled={self.enabled}, URL={self.lm_studio_url}")
-        
-        if self.enabled:
-            print("[DEBUG] Attempting LM Studio call...")
-            answer = self._call_lm_studio(prompt)
-            if not answer:  # If LM Studio failed
-                print("[WARN] LM Studio returned no answer, using fallback")
+        chunks = [chunk async for chunk in self.chat_stream(student_id, message, student_profile)]
+        return "".join(chunks).strip()
+    
+    async def chat_stream(
+        self, 
+        student_id: str, 
+        message: str, 
+        student_profile: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streaming variant of chat(): yields answer chunks as LM Studio generates them.
+        The exchange is saved to memory once the stream has finished.
+        """
+        async with self._chat_locks[student_id]:
+            memory = self.get_or_create_memory(student_id)
+            
+            # Update student context if provided
+            if student_profile:
+                self.set_student_context(student_id, student_profile)
+            
+            # Strip pasted images and oversized text once; every later step uses the stripped message
+            message, blob_refs = _strip_blobs(student_id, message)
+            
+            # Units mentioned in the message (max 3), plus up to 2 previously discussed units
+            mentioned = list(dict.fromkeys(code.upper() for code in UNIT_CODE_RE.findall(message)))[:3]
+            previous = [code for code in memory.discussed_units[:2] if code not in mentioned]
+            
+            # Fetch RAG context and live unit data concurrently
+            rag_context, live_unit_context = await asyncio.gather(
+                self._fetch_rag_context(message),
+                self._fetch_live_unit_context(mentioned + previous)
+            )
+            
+            # Build context-aware messages with RAG + Live data + Memory
+            prompt_messages = self._build_messages(
+                student_id,
+                message, 
+                memory.get_recent_messages(), 
+                student_profile,
+                rag_context=rag_context,
+                live_unit_context=live_unit_context,
+                memory=memory
+            )
+            
+            # Stream response from LM Studio or fallback
+            print(f"[DEBUG] Chat enabled={self.enabled}, URL={self.lm_studio_url}")
+            
+            chunks = []
+            if self.enabled:
+                print("[DEBUG] Attempting LM Studio call...")
+                try:
+                    async for chunk in self._stream_lm_studio(self._encode_payload(student_id, prompt_messages)):
+                        chunks.append(chunk)
+                        yield chunk
+                except Exception as e:
+                    print(f"[WARN] LM Studio call failed: {e}")
+                if not chunks:  # If LM Studio failed before producing anything
+                    print("[WARN] LM Studio returned no answer, using fallback")
+            else:
+                print("[DEBUG] LM Studio disabled, using fallback")
+            
+            if chunks:
+                answer = "".join(chunks).strip()
+                print(f"[OK] Got LM Studio response ({len(answer)} chars)")
+            else:
                 answer = self._fallback_response(message, student_profile, live_unit_context)
-        else:
-            print("[DEBUG] LM Studio disabled, using fallback")
-            answer = self._fallback_response(message, student_profile, live_unit_context)
-        
-        # Save to memory (includes topic tracking)
-        memory.add_message("student", message)
-        memory.add_message("tutor", answer)
-        
-        # Persist conversation to disk
-        self._save_conversation(student_id)
-        
-        return answer
+                yield answer
+            
+            # Save to memory (includes topic tracking); each message is appended to the log
+            memory.add_message("student", message, blob_refs)
+            memory.add_message("tutor", answer)
     
-    def _fetch_rag_context(self, message: str) -> str:
+    async def _fetch_rag_context(self, message: str) -> str:
         """Fetch relevant context from RAG system via Part 1 API"""
+        # Exact-match cache on the normalised message
+        cache_key = hashlib.blake2b(message.lower().strip().encode(), digest_size=16).digest()
+        cached = _cache_get(self._rag_cache, cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = requests.post(
-                f"{PART1_API_URL}/rag/query",
-                json={
+            response = await self._http.post(
+                "/rag/query",
+                content=dumps({
                     "query": message,
                     "k": 3,
                     "include_live": False  # We'll fetch live data separately
-                },
+                }),
+                headers=JSON_HEADERS,
                 timeout=5
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = loads(response.content)
                 results = data.get("results", [])
+                rag_context = ""
                 if results:
                     context_parts = ["=== Relevant Information from Knowledge Base ==="]
                     for r in results[:3]:
                         context_parts.append(f"- {r['content'][:300]}...")
                     print(f"[RAG] Retrieved {len(results)} relevant documents")
-                    return "\n".join(context_parts)
+                    rag_context = "\n".join(context_parts)
+                _cache_put(self._rag_cache, cache_key, rag_context, RAG_CONTEXT_TTL)
+                return rag_context
         except Exception as e:
             print(f"[WARN] RAG query failed: {e}")
         
         return ""
     
-    def _fetch_live_unit_context(self, message: str) -> dict:
-        """Fetch live unit data for any unit codes mentioned in the message"""
-        # Extract unit codes from message (e.g., COMP1010, MATH2000)
-        unit_codes = re.findall(r'[A-Z]{4}\d{4}', message.upper())
-        
+    async def _fetch_live_unit_context(self, unit_codes: List[str]) -> dict:
+        """Fetch live unit data for the given unit codes concurrently"""
         if not unit_codes:
             return {}
         
-        live_data = {}
-        for code in unit_codes[:3]:  # Max 3 units
-            try:
-                response = requests.get(
-                    f"{PART1_API_URL}/unit/{code}",
-                    timeout=10
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    details = data.get("details", {})
-                    live_data[code] = {
-                        "title": details.get("title", "Unknown"),
-                        "prerequisites": details.get("prerequisites", []),
-                        "credit_points": details.get("credit_points", 10),
-                        "learning_outcomes": details.get("learning_outcomes", [])[:3]
-                    }
-                    print(f"[LIVE] Fetched data for {code}: {details.get('title')}")
-            except Exception as e:
-                print(f"[WARN] Failed to fetch {code}: {e}")
-        
-        return live_data
+        results = await asyncio.gather(*(self._fetch_unit(code) for code in unit_codes))
+        return {code: info for code, info in zip(unit_codes, results) if info}
     
-    def _build_prompt(
-        self, 
-        message: str, 
-        messages: List[dict], 
-        profile: Optional[dict] = None,
-        rag_context: str = "",
-        live_unit_context: dict = None,
-        memory: ConversationMemory = None
-    ) -> str:
-        """Build context-aware prompt with student info, RAG context, live unit data, and conversation history"""
-        parts = []
+    async def _fetch_unit(self, code: str) -> Optional[dict]:
+        """Fetch the summary of one unit from the Part 1 API"""
+        cached = _cache_get(self._unit_cache, code)
+        if cached is not None:
+            return cached
         
-        # Add live unit context FIRST (most accurate data)
-        if live_unit_context:
-            parts.append("=== Live Unit Information (Accurate & Current) ===")
-            for code, info in live_unit_context.items():
-                parts.append(f"Unit: {code} - {info['title']}")
-                if info['prerequisites']:
-                    parts.append(f"  Prerequisites: {', '.join(info['prerequisites'])}")
-                else:
-                    parts.append(f"  Prerequisites: None")
-                parts.append(f"  Credit Points: {info['credit_points']}")
-                if info['learning_outcomes']:
-                    parts.append(f"  Key Topics: {'; '.join(info['learning_outcomes'][:2])}")
-            parts.append("")
+        try:
+            response = await self._http.get(f"/unit/{code}")
+            if response.status_code == 200:
+                data = loads(response.content)
+                details = data.get("details", {})
+                print(f"[LIVE] Fetched data for {code}: {details.get('title')}")
+                unit_info = {
+                    "title": details.get("title", "Unknown"),
+                    "prerequisites": details.get("prerequisites", []),
+                    "credit_points": details.get("credit_points", 10),
+                    "learning_outcomes": details.get("learning_outcomes", [])[:3]
+                }
+                _cache_put(self._unit_cache, code, unit_info, UNIT_CONTEXT_TTL)
+                return unit_info
+        except Exception as e:
+            print(f"[WARN] Failed to fetch {code}: {e}")
         
-        # Add RAG context
-        if rag_context:
-            parts.append(rag_context)
-            parts.append("")
+        return None
+    
+    def _build_stable_context(self, profile: Optional[dict] = None, memory: ConversationMemory = None) -> str:
+        """Build the prompt sections that rarely change between turns: student profile and discussed units/topics"""
+        parts = []
         
         # Add student context
         if profile:
@@ -388,15 +947,44 @@ class StudentConversationManager:
                 parts.append(f"Student has asked about: {', '.join(context_summary['discussed_topics'])}")
                 parts.append("")
         
+        return "\n".join(parts)
+    
+    def _build_turn_context(
+        self,
+        message: str,
+        messages: List[dict],
+        rag_context: str = "",
+        live_unit_context: dict = None
+    ) -> str:
+        """Build the prompt sections that change every turn: live unit data, RAG context, history and the question"""
+        parts = []
+        
+        # Add live unit context first (most accurate data)
+        if live_unit_context:
+            parts.append("=== Live Unit Information (Accurate & Current) ===")
+            for code, info in live_unit_context.items():
+                parts.append(f"Unit: {code} - {info['title']}")
+                if info['prerequisites']:
+                    parts.append(f"  Prerequisites: {', '.join(info['prerequisites'])}")
+                else:
+                    parts.append(f"  Prerequisites: None")
+                parts.append(f"  Credit Points: {info['credit_points']}")
+                if info['learning_outcomes']:
+                    parts.append(f"  Key Topics: {'; '.join(info['learning_outcomes'][:2])}")
+            parts.append("")
+        
+        # Add RAG context
+        if rag_context:
+            parts.append(rag_context)
+            parts.append("")
+        
         # Add recent conversation history (last 5 exchanges = 10 messages for better context)
         if messages:
             parts.append("=== Recent Conversation ===")
-            recent = messages[-10:] if len(messages) > 10 else messages
-            for msg in recent:
+            for msg in messages[-PROMPT_HISTORY_MESSAGES:]:
                 role = "Student" if msg["role"] == "student" else "Tutor"
-                # Truncate long messages in history
-                content = msg['content'][:300] + "..." if len(msg['content']) > 300 else msg['content']
-                parts.append(f"{role}: {content}")
+                # Long messages carry a pre-truncated _display
+                parts.append(f"{role}: {msg.get('_display') or msg['content']}")
             parts.append("")
         
         # Add current question
@@ -407,57 +995,110 @@ class StudentConversationManager:
         
         return "\n".join(parts)
     
-    def _call_lm_studio(self, prompt: str) -> Optional[str]:
-        """Call LM Studio API for response"""
-        try:
-            print(f"[DEBUG] Calling {self.lm_studio_url}/chat/completions")
-            print(f"[DEBUG] Model: {self.model_name}")
-            print(f"[DEBUG] Prompt length: {len(prompt)} chars")
-            
-            response = requests.post(
+    def _build_prompt(
+        self, 
+        message: str, 
+        messages: List[dict], 
+        profile: Optional[dict] = None,
+        rag_context: str = "",
+        live_unit_context: dict = None,
+        memory: ConversationMemory = None
+    ) -> str:
+        """Build context-aware prompt with student info, RAG context, live unit data, and conversation history"""
+        stable = self._build_stable_context(profile, memory)
+        turn = self._build_turn_context(message, messages, rag_context, live_unit_context)
+        return f"{stable}\n{turn}" if stable else turn
+    
+    def _build_messages(
+        self,
+        student_id: str,
+        message: str,
+        messages: List[dict],
+        profile: Optional[dict] = None,
+        rag_context: str = "",
+        live_unit_context: dict = None,
+        memory: ConversationMemory = None
+    ) -> List[dict]:
+        """
+        Build chat messages with the stable context in the system message.
+        
+        The system message stays byte-identical across turns until the profile or
+        discussed units change, so LM Studio can reuse its cached prefix and only
+        prefill the new user turn.
+        """
+        stable = self._build_stable_context(profile, memory)
+        system_content = f"{TUTOR_SYSTEM_PROMPT}\n\n{stable}" if stable else TUTOR_SYSTEM_PROMPT
+        
+        system_message = {"role": "system", "content": system_content}
+        
+        fingerprint = hashlib.blake2b(system_content.encode(), digest_size=16).digest()
+        cached = self._prefix_cache.get(student_id)
+        if cached and cached[0] == fingerprint:
+            self._prefix_hits += 1
+        else:
+            self._prefix_cache[student_id] = (fingerprint, dumps(system_message))
+        
+        return [
+            system_message,
+            {"role": "user", "content": self._build_turn_context(message, messages, rag_context, live_unit_context)}
+        ]
+    
+    def _encode_payload(self, student_id: str, messages: List[dict]) -> bytes:
+        """
+        Encode the chat completion request body straight to bytes.
+        
+        The system message is spliced in from the JSON cached by _build_messages,
+        so the stable prefix is only serialized again when it changes.
+        """
+        _, system_json = self._prefix_cache[student_id]
+        return b"".join((
+            b'{"model":', dumps(self.model_name),
+            b',"temperature":0.7,"max_tokens":500,"stream":true,"messages":[',
+            system_json,
+            *(b"," + dumps(m) for m in messages[1:]),
+            b"]}"
+        ))
+    
+    async def _stream_lm_studio(self, payload: bytes) -> AsyncIterator[str]:
+        """Stream answer tokens from LM Studio's chat completions endpoint (SSE)"""
+        print(f"[DEBUG] Calling {self.lm_studio_url}/chat/completions")
+        print(f"[DEBUG] Model: {self.model_name}")
+        print(f"[DEBUG] Request size: {len(payload)} bytes")
+        
+        async with self._lm_semaphore:
+            async with self._http.stream(
+                "POST",
                 f"{self.lm_studio_url}/chat/completions",
-                json={
-                    "model": self.model_name,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": (
-                                "You are a helpful and knowledgeable university tutor. "
-                                "You help students understand course material, plan their studies, "
-                                "and answer questions about their units. "
-                                "Use the student's profile and conversation history to provide "
-                                "personalized, contextual advice. "
-                                "Be encouraging, clear, and educational."
-                            )
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.7,
-                    "max_tokens": 500,
-                    "stream": False
-                },
+                content=payload,
+                headers=JSON_HEADERS,
                 timeout=30
-            )
-            
-            print(f"[DEBUG] LM Studio response status: {response.status_code}")
-            
-            if response.status_code == 200:
-                result = response.json()
-                if "choices" in result and len(result["choices"]) > 0:
-                    answer = result["choices"][0]["message"]["content"].strip()
-                    print(f"[OK] Got LM Studio response ({len(answer)} chars)")
-                    return answer
-            
-            # Fallback if API call fails
-            print(f"[WARN] LM Studio returned status {response.status_code}")
-            return None
-            
-        except Exception as e:
-            print(f"[WARN] LM Studio call failed: {e}")
-            return None
+            ) as response:
+                print(f"[DEBUG] LM Studio response status: {response.status_code}")
+                
+                if response.status_code != 200:
+                    print(f"[WARN] LM Studio returned status {response.status_code}")
+                    return
+                
+                # SSE lines are split and matched as bytes; only the JSON payload is decoded
+                buffer = b""
+                async for raw in response.aiter_bytes():
+                    buffer += raw
+                    *lines, buffer = buffer.split(b"\n")
+                    for line in lines:
+                        if not line.startswith(b"data: "):
+                            continue
+                        data = line[6:].rstrip(b"\r")
+                        if data == b"[DONE]":
+                            return
+                        try:
+                            chunk = loads(data)
+                        except ValueError:
+                            continue
+                        choices = chunk.get("choices")
+                        if choices:
+                            content = choices[0].get("delta", {}).get("content")
+                            if content:
+                                yield content
     
     def _fallback_response(
         self, 
@@ -466,8 +1107,6 @@ class StudentConversationManager:
         live_unit_context: dict = None
     ) -> str:
         """Generate rule-based response when LM Studio unavailable, using live data"""
-        message_lower = message.lower()
-        
         # If we have live unit data, use it for accurate responses
         if live_unit_context:
             unit_codes = list(live_unit_context.keys())
@@ -486,7 +1125,7 @@ class StudentConversationManager:
                     parts.append("")
                 
                 # Add relevant advice based on query type
-                if any(word in message_lower for word in ["prerequisite", "prereq", "eligible", "enroll"]):
+                if ELIGIBILITY_RE.search(message):
                     if profile and profile.get('completed_units'):
                         completed = set(profile['completed_units'])
                         for code in unit_codes:
@@ -499,76 +1138,19 @@ class StudentConversationManager:
                 
                 return "\n".join(parts)
         
-        # Study plan queries
-        if any(word in message_lower for word in ["study", "learn", "prepare", "plan"]):
-            return (
-                "For effective study, I recommend: "
-                "1) Review lecture notes within 24 hours of class. "
-                "2) Practice problems regularly, not just before exams. "
-                "3) Join study groups to discuss concepts. "
-                "4) Use office hours when you're stuck. "
-                "5) Start assignments early to allow time for help."
-            )
-        
-        # Prerequisites queries
-        if any(word in message_lower for word in ["prerequisite", "prereq", "before", "first"]):
-            if profile and profile.get('completed_units'):
-                completed = ", ".join(profile['completed_units'])
-                return (
-                    f"You've completed: {completed}. "
-                    "Check the unit handbook for prerequisite requirements. "
-                    "Generally, you need to pass all prerequisites before enrolling in advanced units."
-                )
-            return (
-                "Prerequisites are units you must complete before taking another unit. "
-                "Check your unit handbook or use the eligibility checker to verify requirements."
-            )
-        
-        # Assignment help
-        if any(word in message_lower for word in ["assignment", "homework", "project", "task"]):
-            return (
-                "For assignment help: "
-                "1) Read the specification carefully multiple times. "
-                "2) Break it into smaller tasks. "
-                "3) Start with what you know. "
-                "4) Use consultation hours for specific questions. "
-                "5) Don't leave it until the last minute!"
-            )
-        
-        # Concept explanation
-        if any(word in message_lower for word in ["explain", "what is", "how does", "understand"]):
-            return (
-                "I'd be happy to explain! For complex concepts: "
-                "1) Start with the basics and build up. "
-                "2) Look for examples and practice problems. "
-                "3) Try explaining it to someone else. "
-                "4) Use multiple resources (textbook, videos, tutorials). "
-                "Could you be more specific about what you'd like to understand?"
-            )
-        
-        # Time management
-        if any(word in message_lower for word in ["time", "week", "schedule", "manage"]):
-            return (
-                "Good time management is key! "
-                "For a typical unit, allocate 8-10 hours per week: "
-                "- 3 hours for lectures/tutorials "
-                "- 2-3 hours reviewing notes "
-                "- 3-4 hours on assignments and practice. "
-                "Use a calendar and set specific study times."
-            )
+        # One scan for every intent, then reply for the highest-priority match
+        matched = {m.lastgroup for m in FALLBACK_RE.finditer(message)}
+        intent = next((intent for intent in FALLBACK_KEYWORDS if intent in matched), None)
         
-        # Difficulty/struggling
-        if any(word in message_lower for word in ["difficult", "hard", "struggle", "confused", "help"]):
+        if intent == "prereq" and profile and profile.get('completed_units'):
+            completed = ", ".join(profile['completed_units'])
             return (
-                "Don't worry, many students find some topics challenging! "
-                "Here's what to do: "
-                "1) Identify exactly what you don't understand. "
-                "2) Review the basics first. "
-                "3) Attend consultation hours or ask in tutorials. "
-                "4) Form a study group. "
-                "5) Use online resources for different explanations. "
-                "What specific topic are you struggling with?"
+                f"You've completed: {completed}. "
+                "Check the unit handbook for prerequisite requirements. "
+                "Generally, you need to pass all prerequisites before enrolling in advanced units."
             )
+        if intent:
+            return FALLBACK_REPLIES[intent]
         
         # General response
         name = profile.get('name', 'there') if profile else 'there'
@@ -583,6 +1165,33 @@ class StudentConversationManager:
         memory = self.get_or_create_memory(student_id)
         return memory.get_messages()
     
+    def iter_history_bytes(self, student_id: str) -> Iterator[bytes]:
+        """
+        Stream a student's history as a JSON document straight from the log.
+        
+        Message lines are passed through as stored, minus their "type" field,
+        instead of being decoded and re-encoded. Unlike get_conversation_history
+        this covers every message since the last clear, not just the in-memory window.
+        """
+        self._load_one(student_id)
+        self.flush()
+        
+        messages = []
+        file_path = PERSISTENCE_DIR / f"{student_id}.jsonl"
+        if file_path.exists():
+            for line in _iter_log_lines(file_path):
+                if line in CLEAR_RECORD_LINES:
+                    messages.clear()
+                elif line.endswith(b"}"):  # skips a torn final line
+                    for prefix in MESSAGE_RECORD_PREFIXES:
+                        if line.startswith(prefix):
+                            messages.append(b"{" + line[len(prefix):])
+                            break
+        
+        yield b'{"student_id":' + dumps(student_id) + b',"messages":['
+        yield b",".join(messages)
+        yield b'],"total_messages":' + str(len(messages)).encode() + b"}"
+    
     def get_conversation_context(self, student_id: str) -> dict:
         """Get full conversation context including topics and units discussed"""
         memory = self.get_or_create_memory(student_id)
@@ -594,9 +1203,10 @@ class StudentConversationManager:
     
     def clear_conversation(self, student_id: str):
         """Clear conversation history for a student (keeps profile)"""
+        self._load_one(student_id)
         if student_id in self.conversations:
             self.conversations[student_id].clear()
-            self._save_conversation(student_id)
+            self._append_record(student_id, {"type": "clear"})
     
     def delete_student_data(self, student_id: str):
         """Completely remove student data including files"""
@@ -606,32 +1216,60 @@ class StudentConversationManager:
         if student_id in self.student_contexts:
             del self.student_contexts[student_id]
         
-        # Delete persistence file
+        self._known_ids.discard(student_id)
+        
+        with self._file_locks[student_id], self._write_lock:
+            self._pending_writes.pop(student_id, None)
+            log_file = self._log_files.pop(student_id, None)
+            if log_file:
+                log_file.close()
+        
+        # Delete persistence files, including any pre-log JSON snapshot and stored blobs
         try:
-            file_path = PERSISTENCE_DIR / f"{student_id}.json"
-            if file_path.exists():
-                file_path.unlink()
+            for suffix in (".jsonl", ".json"):
+                file_path = PERSISTENCE_DIR / f"{student_id}{suffix}"
+                if file_path.exists():
+                    file_path.unlink()
+            if STUDENT_ID_RE.fullmatch(student_id):
+                shutil.rmtree(_blob_dir(student_id), ignore_errors=True)
         except Exception as e:
             print(f"[WARN] Failed to delete file for {student_id}: {e}")
     
     def get_statistics(self) -> dict:
         """Get detailed statistics about conversations"""
-        all_discussed_units = set()
-        all_discussed_topics = set()
+        # Conversations not loaded yet are summarised from the tail of their logs
+        unloaded = [sid for sid in self._known_ids if sid not in self.conversations]
+        with ThreadPoolExecutor(max_workers=STATS_SCAN_WORKERS) as pool:
+            scanned = pool.map(_scan_summary, (PERSISTENCE_DIR / f"{sid}.jsonl" for sid in unloaded))
+            summaries = dict(zip(unloaded, scanned))
+        
+        # Logs without a summary (e.g. legacy JSON) fall back to a full load
+        for student_id, summary in list(summaries.items()):
+            if summary is None:
+                self._load_one(student_id)
+                del summaries[student_id]
         
-        for mem in self.conversations.values():
-            all_discussed_units.update(mem.discussed_units)
-            all_discussed_topics.update(mem.discussed_topics)
+        # Aggregate with C-level map/union over the memories' existing sets and columns
+        loaded = self.conversations.values()
+        all_discussed_units = set().union(
+            *map(attrgetter("_units_set"), loaded),
+            *(summary.get("discussed_units", []) for summary in summaries.values())
+        )
+        all_discussed_topics = set().union(
+            *map(attrgetter("_topics_set"), loaded),
+            *(summary.get("discussed_topics", []) for summary in summaries.values())
+        )
         
         return {
-            "total_students": len(self.conversations),
-            "total_messages": sum(
-                len(mem.get_messages())
-                for mem in self.conversations.values()
+            "total_students": len(self.conversations) + len(summaries),
+            "total_messages": sum(map(attrgetter("total_messages"), loaded))
+                + sum(summary.get("total_messages", 0) for summary in summaries.values()),
+            "students_with_context": len(self.student_contexts) + sum(
+                1 for summary in summaries.values() if summary.get("has_context")
             ),
-            "students_with_context": len(self.student_contexts),
             "all_discussed_units": list(all_discussed_units),
             "all_discussed_topics": list(all_discussed_topics),
+            "prefix_cache_hits": self._prefix_hits,
             "persistence_enabled": True,
             "persistence_dir": str(PERSISTENCE_DIR)
         }
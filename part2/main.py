@@ -4,19 +4,30 @@ Provides personalized study reports, student management, and conversational AI t
 """
 
 import os
+import re
 import sys
-import json
+import asyncio
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import lru_cache, cached_property
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from enum import Enum
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-import requests
+import httpx
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # optional: only needed for a shared student store
+    redis_asyncio = None
 
 load_dotenv()
 
@@ -24,7 +35,7 @@ load_dotenv()
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from backend.unit_search import search_unit, UnitSearcher
 
-from .conversation_manager import StudentConversationManager
+from .conversation_manager import STUDENT_ID_RE, StudentConversationManager, dumps, orjson
 
 
 # Configuration
@@ -34,6 +45,45 @@ LM_STUDIO_URL = os.getenv("LM_STUDIO_URL", "http://localhost:1234/v1")
 LM_STUDIO_MODEL = os.getenv("LM_STUDIO_MODEL", "local-model")
 USE_LM_STUDIO = os.getenv("USE_LM_STUDIO", "false").lower() == "true"
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
+# Set to share student profiles between uvicorn workers
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Shared outbound HTTP pool, created in lifespan
+HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=300)
+# LM Studio requests allowed in flight at once, across reports and chat. Community
+# LM Studio returns empty completions for queued concurrent requests, so default to 1
+LM_STUDIO_MAX_CONCURRENCY = int(os.getenv("LM_STUDIO_MAX_CONCURRENCY", "1"))
+
+# Unit details change rarely, so Part 1 lookups are cached per unit code
+UNIT_DETAILS_TTL = float(os.getenv("UNIT_DETAILS_TTL", "3600"))
+UNIT_DETAILS_CACHE_SIZE = 2048
+
+# Finished GET /tutor-report responses, keyed by unit code and student
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "600"))
+REPORT_CACHE_SIZE = 512
+# Set per GET /tutor-report request; fallbacks used while building the report are
+# recorded here so a degraded report is not cached
+_report_fallbacks: ContextVar[Optional[List[str]]] = ContextVar("report_fallbacks", default=None)
+
+# Upper bound on the serialized profile sent to the chat prompt each turn
+PROFILE_CONTEXT_MAX_CHARS = 200
+
+# Responses smaller than this are sent uncompressed
+GZIP_MIN_SIZE = 1024
+# Streaming routes bypass gzip: the pinned fastapi 0.104 / Starlette 0.27 GZipMiddleware
+# compresses text/event-stream too and holds chunks back until the stream ends
+GZIP_EXCLUDED_SUFFIX = "/stream"
+
+# Final frame of every SSE stream
+SSE_DONE_FRAME = b'data: {"done":true}\n\n'
+# Fixed surround of each chat token frame; only the escaped token is encoded per chunk
+_DATA_PREFIX = b'data: {"content":"'
+_DATA_SUFFIX = b'"}\n\n'
+
+# "ULO1:"-style prefixes on learning outcomes
+ULO_PREFIX_RE = re.compile(r'ULO\d+:')
+# Outcome keywords that each add one point to a unit's difficulty score
+DIFFICULTY_RE = re.compile(r'\b(advanced|complex|analyze|evaluate|design|implement)\b', re.IGNORECASE)
 
 
 # Enums and Models
@@ -92,12 +142,27 @@ class TutorReport(BaseModel):
 
 
 class StudentProfile(BaseModel):
-    student_id: str
+    # Student ids name conversation log and blob paths, so they are checked here, at the API boundary
+    student_id: str = Field(pattern=STUDENT_ID_RE.pattern)
     name: str
     degree: str
     major: Optional[str] = None
     completed_units: List[str]
     enrolled_units: List[str]
+    
+    @cached_property
+    def as_context(self) -> dict:
+        """Slim profile for the chat prompt, computed once per instance.
+        Enrolled units are dropped from the end until it fits PROFILE_CONTEXT_MAX_CHARS."""
+        context = {
+            "name": self.name,
+            "degree": self.degree,
+            "major": self.major,
+            "enrolled_units": list(self.enrolled_units)
+        }
+        while context["enrolled_units"] and len(dumps(context)) > PROFILE_CONTEXT_MAX_CHARS:
+            context["enrolled_units"].pop()
+        return context
 
 
 class TutorRequest(BaseModel):
@@ -109,7 +174,7 @@ class TutorRequest(BaseModel):
 
 
 class ChatRequest(BaseModel):
-    student_id: str
+    student_id: str = Field(pattern=STUDENT_ID_RE.pattern)
     message: str
 
 
@@ -128,40 +193,110 @@ class ChatHistory(BaseModel):
 
 # Student Management
 
+DEMO_STUDENTS = [
+    StudentProfile(
+        student_id="demo001",
+        name="Alex Chen",
+        degree="Bachelor of Information Technology",
+        major="Software Development",
+        completed_units=["COMP1000"],
+        enrolled_units=["COMP1010", "COMP1350"]
+    ),
+    StudentProfile(
+        student_id="demo002",
+        name="Sarah Johnson",
+        degree="Bachelor of Information Technology",
+        major="Cyber Security",
+        completed_units=["COMP1000", "COMP1010", "COMP1300"],
+        enrolled_units=["COMP2300", "COMP2310"]
+    )
+]
+
+
+class InMemoryStudentStore:
+    """Process-local student store for single-worker and development use."""
+    
+    def __init__(self):
+        # Each operation is a single dict call with no await inside,
+        # so it is atomic with respect to other coroutines
+        self._students: Dict[str, StudentProfile] = {}
+    
+    async def seed(self, profiles: List[StudentProfile]):
+        for profile in profiles:
+            self._students.setdefault(profile.student_id, profile)
+    
+    async def get(self, student_id: str) -> Optional[StudentProfile]:
+        return self._students.get(student_id)
+    
+    async def list(self) -> List[StudentProfile]:
+        return list(self._students.values())
+    
+    async def iter_json(self) -> AsyncIterator[bytes]:
+        for profile in list(self._students.values()):
+            yield profile.model_dump_json().encode()
+    
+    async def put(self, profile: StudentProfile) -> StudentProfile:
+        self._students[profile.student_id] = profile
+        return profile
+    
+    async def aclose(self):
+        pass
+
+
+class RedisStudentStore:
+    """Student store in a Redis hash, shared by every worker process."""
+    
+    KEY = "degreepath:students"
+    
+    def __init__(self, url: str):
+        self._redis = redis_asyncio.from_url(url)
+    
+    async def seed(self, profiles: List[StudentProfile]):
+        for profile in profiles:
+            await self._redis.hsetnx(self.KEY, profile.student_id, profile.model_dump_json())
+    
+    async def get(self, student_id: str) -> Optional[StudentProfile]:
+        data = await self._redis.hget(self.KEY, student_id)
+        return StudentProfile.model_validate_json(data) if data else None
+    
+    async def list(self) -> List[StudentProfile]:
+        return [StudentProfile.model_validate_json(data) for data in await self._redis.hvals(self.KEY)]
+    
+    async def iter_json(self) -> AsyncIterator[bytes]:
+        # Profiles are stored as JSON already, so they are passed through without validation
+        async for _, data in self._redis.hscan_iter(self.KEY):
+            yield data
+    
+    async def put(self, profile: StudentProfile) -> StudentProfile:
+        await self._redis.hset(self.KEY, profile.student_id, profile.model_dump_json())
+        return profile
+    
+    async def aclose(self):
+        await self._redis.aclose()
+
+
 class StudentManager:
-    """In-memory student management."""
-    
-    STUDENTS_DB = {
-        "demo001": StudentProfile(
-            student_id="demo001",
-            name="Alex Chen",
-            degree="Bachelor of Information Technology",
-            major="Software Development",
-            completed_units=["COMP1000"],
-            enrolled_units=["COMP1010", "COMP1350"]
-        ),
-        "demo002": StudentProfile(
-            student_id="demo002",
-            name="Sarah Johnson",
-            degree="Bachelor of Information Technology",
-            major="Cyber Security",
-            completed_units=["COMP1000", "COMP1010", "COMP1300"],
-            enrolled_units=["COMP2300", "COMP2310"]
-        )
-    }
+    """Student management backed by Redis when REDIS_URL is set, otherwise in memory."""
+    
+    store = RedisStudentStore(REDIS_URL) if REDIS_URL and redis_asyncio else InMemoryStudentStore()
     
     @classmethod
-    def get_student(cls, student_id: str) -> Optional[StudentProfile]:
-        return cls.STUDENTS_DB.get(student_id)
+    async def get_student(cls, student_id: str) -> Optional[StudentProfile]:
+        return await cls.store.get(student_id)
     
     @classmethod
-    def list_students(cls) -> List[StudentProfile]:
-        return list(cls.STUDENTS_DB.values())
+    async def list_students(cls) -> List[StudentProfile]:
+        return await cls.store.list()
     
     @classmethod
-    def create_student(cls, profile: StudentProfile) -> StudentProfile:
-        cls.STUDENTS_DB[profile.student_id] = profile
-        return profile
+    async def iter_students_ndjson(cls) -> AsyncIterator[bytes]:
+        """One JSON line per student, read incrementally from the store."""
+        async for data in cls.store.iter_json():
+            yield data + b"\n"
+    
+    @classmethod
+    async def create_student(cls, profile: StudentProfile) -> StudentProfile:
+        return await cls.store.put(profile)
 
 
 # LM Studio Client
@@ -174,23 +309,43 @@ class LMStudioClient:
         self.model_name = LM_STUDIO_MODEL
         self.enabled = USE_LM_STUDIO
         self.available = False
+        self.semaphore = asyncio.Semaphore(LM_STUDIO_MAX_CONCURRENCY)
         
-    def test_connection(self) -> bool:
+    async def test_connection(self) -> bool:
         """Test if LM Studio is available."""
         if not self.enabled:
             return False
         
         try:
-            response = requests.get(f"{self.base_url}/models", timeout=5)
+            response = await app.state.http.get(f"{self.base_url}/models", timeout=5)
             if response.status_code == 200:
                 self.available = True
                 return True
-        except requests.exceptions.RequestException:
+        except httpx.HTTPError:
             pass
         
         return False
     
-    def generate_text(self, prompt: str, max_tokens: int = 250) -> Optional[str]:
+    async def prewarm(self):
+        """Send a 1-token completion so a keep-alive connection is open before the first report."""
+        if not self.available or not self.enabled:
+            return
+        
+        try:
+            async with self.semaphore:
+                await app.state.http.post(
+                    f"{self.base_url}/chat/completions",
+                    json={
+                        "model": self.model_name,
+                        "messages": [{"role": "user", "content": "ping"}],
+                        "max_tokens": 1
+                    },
+                    timeout=30
+                )
+        except httpx.HTTPError:
+            pass
+    
+    async def generate_text(self, prompt: str, max_tokens: int = 250) -> Optional[str]:
         """Generate text using LM Studio API."""
         if not self.available or not self.enabled:
             return None
@@ -207,74 +362,88 @@ class LMStudioClient:
                 "stream": False
             }
             
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                json=payload,
-                timeout=15
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if "choices" in result and len(result["choices"]) > 0:
-                    return result["choices"][0]["message"]["content"].strip()
+            async with self.semaphore:
+                for attempt in range(2):
+                    response = await app.state.http.post(
+                        f"{self.base_url}/chat/completions",
+                        json=payload,
+                        timeout=15
+                    )
+                    if response.status_code != 200:
+                        break
+                    
+                    result = response.json()
+                    # An empty completion means the request was dropped in LM Studio's queue; retry once
+                    if result.get("usage", {}).get("completion_tokens") == 0 and attempt == 0:
+                        continue
+                    if "choices" in result and len(result["choices"]) > 0:
+                        return result["choices"][0]["message"]["content"].strip()
+                    break
         except Exception:
             pass
         
+        _record_fallback("lm_studio")
         return None
 
 
+def _record_fallback(reason: str):
+    """Note that the report being built uses fallback content"""
+    fallbacks = _report_fallbacks.get()
+    if fallbacks is not None:
+        fallbacks.append(reason)
+
+
 # Resource Generator
 
+# General resources by unit code prefix, built once at import
+TOPIC_RESOURCES: Dict[str, Tuple[PublicResource, ...]] = {
+    prefix: tuple(
+        PublicResource(title=title, url=url, type=ResourceType.TUTORIAL, why=why)
+        for title, url, why in entries
+    )
+    for prefix, entries in {
+        'COMP': [
+            ('GeeksforGeeks', 'https://www.geeksforgeeks.org/', 'CS tutorials and practice'),
+            ('Stack Overflow', 'https://stackoverflow.com/', 'Community Q&A'),
+            ('MIT OpenCourseWare', 'https://ocw.mit.edu/courses/electrical-engineering-and-computer-science/', 'Free courses'),
+        ],
+        'MATH': [
+            ('Khan Academy', 'https://www.khanacademy.org/math', 'Free math tutorials'),
+            ('Wolfram Alpha', 'https://www.wolframalpha.com/', 'Computational math'),
+        ],
+        'STAT': [
+            ('Khan Academy Statistics', 'https://www.khanacademy.org/math/statistics-probability', 'Statistics tutorials'),
+        ],
+    }.items()
+}
+
+
 class ResourceGenerator:
     """Generate learning resources for units."""
     
     @staticmethod
-    def get_resources(unit_code: str, max_results: int = 6) -> List[Dict[str, str]]:
+    def get_resources(unit_code: str, max_results: int = 6) -> List[PublicResource]:
         """Generate learning resources for a unit."""
-        resources = [
-            {
-                'title': f'{unit_code} - Official Unit Guide',
-                'url': f'https://unitguides.mq.edu.au/unit_offerings/units/show/{unit_code}',
-                'type': ResourceType.ARTICLE.value,
-                'why': 'Official Macquarie University unit guide'
-            }
-        ]
-        
-        code_prefix = unit_code[:4].upper()
-        
-        topic_resources = {
-            'COMP': [
-                ('GeeksforGeeks', 'https://www.geeksforgeeks.org/', 'CS tutorials and practice'),
-                ('Stack Overflow', 'https://stackoverflow.com/', 'Community Q&A'),
-                ('MIT OpenCourseWare', 'https://ocw.mit.edu/courses/electrical-engineering-and-computer-science/', 'Free courses'),
-            ],
-            'MATH': [
-                ('Khan Academy', 'https://www.khanacademy.org/math', 'Free math tutorials'),
-                ('Wolfram Alpha', 'https://www.wolframalpha.com/', 'Computational math'),
-            ],
-            'STAT': [
-                ('Khan Academy Statistics', 'https://www.khanacademy.org/math/statistics-probability', 'Statistics tutorials'),
-            ],
-        }
-        
-        topic_list = topic_resources.get(code_prefix, topic_resources['COMP'])
-        
-        for title, url, why in topic_list:
-            resources.append({
-                'title': title,
-                'url': url,
-                'type': ResourceType.TUTORIAL.value,
-                'why': why
-            })
-        
-        resources.append({
-            'title': f'{unit_code} Tutorials - YouTube',
-            'url': f'https://www.youtube.com/results?search_query={unit_code}+tutorial',
-            'type': ResourceType.VIDEO.value,
-            'why': 'Video tutorials'
-        })
-        
-        return resources[:max_results]
+        return list(ResourceGenerator._build_resources(unit_code, max_results))
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _build_resources(unit_code: str, max_results: int) -> Tuple[PublicResource, ...]:
+        """Build the resource list once per unit; only the first and last entries are unit-specific."""
+        unit_guide = PublicResource(
+            title=f'{unit_code} - Official Unit Guide',
+            url=f'https://unitguides.mq.edu.au/unit_offerings/units/show/{unit_code}',
+            type=ResourceType.ARTICLE,
+            why='Official Macquarie University unit guide'
+        )
+        videos = PublicResource(
+            title=f'{unit_code} Tutorials - YouTube',
+            url=f'https://www.youtube.com/results?search_query={unit_code}+tutorial',
+            type=ResourceType.VIDEO,
+            why='Video tutorials'
+        )
+        topic_list = TOPIC_RESOURCES.get(unit_code[:4].upper(), TOPIC_RESOURCES['COMP'])
+        return (unit_guide, *topic_list, videos)[:max_results]
 
 
 # Part 1 API Client
@@ -282,11 +451,46 @@ class ResourceGenerator:
 class Part1APIClient:
     """Client for Part 1 API with fallback to direct web search."""
     
+    # unit code -> (expires_at, task); concurrent misses share one in-flight task
+    _cache: Dict[str, Tuple[float, "asyncio.Task"]] = {}
+    
+    @classmethod
+    async def fetch_unit_details(cls, unit_code: str) -> Dict[str, Any]:
+        """Fetch unit details, reusing a cached or in-flight lookup for the same unit."""
+        key = unit_code.upper()
+        cached = cls._cache.get(key)
+        # shield() so a cancelled request does not cancel the lookup other requests share
+        if cached and cached[0] > time.monotonic():
+            details = await asyncio.shield(cached[1])
+        else:
+            if len(cls._cache) >= UNIT_DETAILS_CACHE_SIZE and key not in cls._cache:
+                del cls._cache[next(iter(cls._cache))]
+            task = asyncio.ensure_future(cls._fetch_unit_details(unit_code))
+            cls._cache[key] = (time.monotonic() + UNIT_DETAILS_TTL, task)
+            try:
+                details = await asyncio.shield(task)
+            except Exception:
+                cls._cache.pop(key, None)
+                raise
+        
+        if details is None:
+            # Not cached, so the next request tries the upstream sources again
+            cls._cache.pop(key, None)
+            _record_fallback("unit_details")
+            return {
+                "title": f"{unit_code} - Details Unavailable",
+                "year_level": int(unit_code[4]) if len(unit_code) > 4 and unit_code[4].isdigit() else 1,
+                "prerequisites": [],
+                "learning_outcomes": [],
+                "description": "Unit details temporarily unavailable.",
+            }
+        return details
+    
     @staticmethod
-    def fetch_unit_details(unit_code: str) -> Dict[str, Any]:
+    async def _fetch_unit_details(unit_code: str) -> Optional[Dict[str, Any]]:
         """Fetch unit details from Part 1 or fallback to web search."""
         try:
-            response = requests.get(f"{PART1_API_URL}/unit/{unit_code}", timeout=10)
+            response = await app.state.http.get(f"{PART1_API_URL}/unit/{unit_code}", timeout=10)
             response.raise_for_status()
             data = response.json()
             details = data.get("details", {})
@@ -294,11 +498,12 @@ class Part1APIClient:
             if details.get("title") or details.get("prerequisites"):
                 return details
             
-            raise requests.exceptions.RequestException("Empty response")
+            raise httpx.HTTPError("Empty response")
             
-        except requests.exceptions.RequestException:
+        except (httpx.HTTPError, ValueError):
             try:
-                web_data = search_unit(unit_code)
+                # The scraper is blocking, so keep it off the event loop
+                web_data = await asyncio.to_thread(search_unit, unit_code)
                 if web_data and web_data.get("unit_code"):
                     return {
                         "title": web_data.get("title", "Unknown Unit"),
@@ -312,13 +517,7 @@ class Part1APIClient:
             except Exception:
                 pass
             
-            return {
-                "title": f"{unit_code} - Details Unavailable",
-                "year_level": int(unit_code[4]) if len(unit_code) > 4 and unit_code[4].isdigit() else 1,
-                "prerequisites": [],
-                "learning_outcomes": [],
-                "description": "Unit details temporarily unavailable.",
-            }
+            return None
 
 
 # Report Generator
@@ -330,13 +529,18 @@ class TutorReportGenerator:
         self.lm_client = lm_client
         self.api_client = Part1APIClient()
     
-    def generate_report(self, request: TutorRequest) -> TutorReport:
+    async def generate_report(self, request: TutorRequest) -> TutorReport:
         """Generate comprehensive tutor report."""
-        unit_details = self.api_client.fetch_unit_details(request.unit_code)
+        sections = {section: value async for section, value in self.stream_report(request)}
+        return TutorReport(**sections)
+    
+    async def stream_report(self, request: TutorRequest) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield (section, value) pairs: rule-based sections at once, LM-backed ones as they finish."""
+        unit_details = await self.api_client.fetch_unit_details(request.unit_code)
         
         student_profile = None
         if request.student_id:
-            student_profile = StudentManager.get_student(request.student_id)
+            student_profile = await StudentManager.get_student(request.student_id)
             if student_profile:
                 request.completed_units = student_profile.completed_units
                 request.degree = student_profile.degree
@@ -347,54 +551,81 @@ class TutorReportGenerator:
         year_level = unit_details.get("year_level", 1)
         title = unit_details.get("title", "Unknown Unit")
         
-        summary = self._generate_summary(request.unit_code, title, learning_outcomes)
         difficulty = self._estimate_difficulty(year_level, learning_outcomes, prerequisites)
-        core_skills = self._extract_core_skills(learning_outcomes)
-        key_concepts = self._generate_key_concepts(learning_outcomes)
-        study_plan = self._create_study_plan(learning_outcomes, difficulty)
-        quizzes = self._generate_quizzes(learning_outcomes, difficulty)
-        resources = ResourceGenerator.get_resources(request.unit_code)
-        student_notes = self._generate_student_notes(
-            request.completed_units or [],
-            prerequisites,
-            difficulty,
-            student_profile
-        )
         
-        return TutorReport(
-            unit_code=request.unit_code,
-            summary=summary,
-            difficulty=difficulty,
-            core_skills=core_skills,
-            key_concepts=key_concepts,
-            study_plan=study_plan,
-            quizzes=quizzes,
-            public_resources=[PublicResource(**r) for r in resources],
-            student_specific_notes=student_notes,
-            meta=TutorReportMeta(generated_at=datetime.utcnow().isoformat())
-        )
+        # The LM-backed sections are independent, so their calls all run concurrently
+        lm_sections = [
+            asyncio.create_task(self._named("summary", self._generate_summary(request.unit_code, title, learning_outcomes))),
+            asyncio.create_task(self._named("key_concepts", self._generate_key_concepts(learning_outcomes))),
+            asyncio.create_task(self._named("quizzes", self._generate_quizzes(learning_outcomes, difficulty)))
+        ]
+        
+        try:
+            yield "unit_code", request.unit_code
+            yield "difficulty", difficulty
+            
+            # Rule-based assembly is plain Python string work; run it in a worker
+            # thread so it doesn't hold up other requests' streams on the loop
+            for section in await asyncio.to_thread(
+                self._rule_based_sections,
+                request,
+                learning_outcomes,
+                prerequisites,
+                difficulty,
+                student_profile
+            ):
+                yield section
+            
+            for next_section in asyncio.as_completed(lm_sections):
+                yield await next_section
+            
+            yield "meta", TutorReportMeta(generated_at=datetime.utcnow().isoformat())
+        finally:
+            for task in lm_sections:
+                task.cancel()
+    
+    @staticmethod
+    async def _named(section: str, coro) -> Tuple[str, Any]:
+        return section, await coro
+    
+    def _rule_based_sections(
+        self,
+        request: TutorRequest,
+        learning_outcomes: List[str],
+        prerequisites: List[str],
+        difficulty: DifficultyLevel,
+        student_profile: Optional[StudentProfile]
+    ) -> List[Tuple[str, Any]]:
+        return [
+            ("core_skills", self._extract_core_skills(learning_outcomes)),
+            ("study_plan", self._create_study_plan(learning_outcomes, difficulty)),
+            ("public_resources", ResourceGenerator.get_resources(request.unit_code)),
+            ("student_specific_notes", self._generate_student_notes(
+                request.completed_units or [],
+                prerequisites,
+                difficulty,
+                student_profile
+            ))
+        ]
     
-    def _generate_summary(self, unit_code: str, title: str, outcomes: List[str]) -> str:
+    async def _generate_summary(self, unit_code: str, title: str, outcomes: List[str]) -> str:
         if not outcomes:
             return f"{title} introduces foundational concepts in computer science."
         
         prompt = f"Write a 2-3 sentence summary for: {title} ({unit_code}). Key outcomes: {'; '.join(outcomes[:3])}"
-        ai_summary = self.lm_client.generate_text(prompt, max_tokens=150)
+        ai_summary = await self.lm_client.generate_text(prompt, max_tokens=150)
         
         if ai_summary and len(ai_summary) > 50:
             return ai_summary
         
-        first_outcome = outcomes[0].replace("ULO1:", "").strip()[:150]
+        first_outcome = ULO_PREFIX_RE.sub("", outcomes[0]).strip()[:150]
         return f"{title} focuses on {first_outcome}. Students develop theoretical understanding and practical skills."
     
     def _estimate_difficulty(self, year_level: int, outcomes: List[str], prereqs: List[str]) -> DifficultyLevel:
         score = (year_level - 1) * 2 + len(prereqs)
         
-        complexity_keywords = ["advanced", "complex", "analyze", "evaluate", "design", "implement"]
-        outcome_text = " ".join(outcomes).lower()
-        for keyword in complexity_keywords:
-            if keyword in outcome_text:
-                score += 1
+        # One pass over the outcomes; each distinct keyword counts once
+        score += len({keyword.lower() for keyword in DIFFICULTY_RE.findall(" ".join(outcomes))})
         
         if score <= 3:
             return DifficultyLevel.EASY
@@ -405,20 +636,22 @@ class TutorReportGenerator:
     def _extract_core_skills(self, outcomes: List[str]) -> List[str]:
         skills = []
         for outcome in outcomes:
-            clean = outcome.replace("ULO1:", "").replace("ULO2:", "").replace("ULO3:", "").replace("ULO4:", "").replace("ULO5:", "").strip()[:80]
+            clean = ULO_PREFIX_RE.sub("", outcome).strip()[:80]
             if clean and clean not in skills:
                 skills.append(clean)
         return skills[:7]
     
-    def _generate_key_concepts(self, outcomes: List[str]) -> List[KeyConcept]:
+    async def _generate_key_concepts(self, outcomes: List[str]) -> List[KeyConcept]:
+        clean_outcomes = [ULO_PREFIX_RE.sub("", outcome).strip() for outcome in outcomes[:5]]
+        explanations = await asyncio.gather(*(
+            self.lm_client.generate_text(f"Explain briefly for a student: {clean_outcome}", max_tokens=100)
+            for clean_outcome in clean_outcomes
+        ))
+        
         concepts = []
-        for i, outcome in enumerate(outcomes[:5], 1):
-            clean_outcome = outcome.replace(f"ULO{i}:", "").strip()
+        for clean_outcome, explanation in zip(clean_outcomes, explanations):
             concept_name = " ".join(clean_outcome.split()[:6])
             
-            prompt = f"Explain briefly for a student: {clean_outcome}"
-            explanation = self.lm_client.generate_text(prompt, max_tokens=100)
-            
             if not explanation or len(explanation) < 20:
                 explanation = f"This focuses on {clean_outcome[:120]}."
             
@@ -440,20 +673,24 @@ class TutorReportGenerator:
             start = (week - 1) * outcomes_per_week
             
             for outcome in outcomes[start:start + outcomes_per_week]:
-                clean = outcome.replace("ULO1:", "").replace("ULO2:", "").replace("ULO3:", "").replace("ULO4:", "").replace("ULO5:", "").strip()
+                clean = ULO_PREFIX_RE.sub("", outcome).strip()
                 tasks.append(f"Master: {clean[:65]}")
             
             plan.append(WeeklyTask(week=week, tasks=tasks[:6]))
         return plan
     
-    def _generate_quizzes(self, outcomes: List[str], difficulty: DifficultyLevel) -> List[Quiz]:
+    async def _generate_quizzes(self, outcomes: List[str], difficulty: DifficultyLevel) -> List[Quiz]:
+        clean_outcomes = [ULO_PREFIX_RE.sub("", outcome).strip() for outcome in outcomes[:5]]
+        ai_quizzes = await asyncio.gather(*(
+            self.lm_client.generate_text(
+                f"Create a quiz question and answer for: {clean}\nFormat: Question: [question]\nAnswer: [answer]",
+                max_tokens=200
+            )
+            for clean in clean_outcomes
+        ))
+        
         quizzes = []
-        for i, outcome in enumerate(outcomes[:5]):
-            clean = outcome.replace(f"ULO{i+1}:", "").strip()
-            
-            prompt = f"Create a quiz question and answer for: {clean}\nFormat: Question: [question]\nAnswer: [answer]"
-            ai_quiz = self.lm_client.generate_text(prompt, max_tokens=200)
-            
+        for i, (clean, ai_quiz) in enumerate(zip(clean_outcomes, ai_quizzes)):
             if ai_quiz and "Answer:" in ai_quiz:
                 parts = ai_quiz.split("Answer:")
                 question = parts[0].replace("Question:", "").strip()
@@ -496,6 +733,20 @@ class TutorReportGenerator:
         return "".join(notes)
 
 
+class StreamingAwareGZipMiddleware:
+    """GZipMiddleware that leaves streaming routes uncompressed so each chunk is sent as it is produced"""
+    
+    def __init__(self, app, minimum_size: int = GZIP_MIN_SIZE):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith(GZIP_EXCLUDED_SUFFIX):
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+
 # FastAPI Application
 
 lm_studio_client = LMStudioClient()
@@ -503,17 +754,28 @@ lm_studio_client = LMStudioClient()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    lm_studio_client.test_connection()
+    app.state.http = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=10)
+    await StudentManager.store.seed(DEMO_STUDENTS)
+    if await lm_studio_client.test_connection():
+        # Warm both pools that talk to LM Studio: reports and chat
+        await asyncio.gather(lm_studio_client.prewarm(), conversation_manager.prewarm())
     yield
+    await app.state.http.aclose()
+    await StudentManager.store.aclose()
+    await conversation_manager.aclose()
 
 
 app = FastAPI(
     title="DegreePath Tutor - Part 2",
     description="AI-powered tutor with study reports and conversational AI",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if orjson else JSONResponse
 )
 
+# Large JSON responses are gzipped; /chat/stream, /tutor-report/stream and /students/stream are not
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=GZIP_MIN_SIZE)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
@@ -527,12 +789,26 @@ report_generator = TutorReportGenerator(lm_studio_client)
 conversation_manager = StudentConversationManager(
     lm_studio_url=LM_STUDIO_URL,
     model_name=LM_STUDIO_MODEL,
-    enabled=USE_LM_STUDIO
+    enabled=USE_LM_STUDIO,
+    lm_semaphore=lm_studio_client.semaphore
 )
 
 
 # Endpoints
 
+async def get_student_or_404(student_id: str) -> StudentProfile:
+    """Resolve a student_id path parameter, raising 404 for unknown students."""
+    student = await StudentManager.get_student(student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail=f"Student not found: {student_id}")
+    return student
+
+
+async def get_chat_student(request: ChatRequest) -> StudentProfile:
+    """Resolve the student named in a chat request body."""
+    return await get_student_or_404(request.student_id)
+
+
 @app.get("/")
 def read_root():
     return {
@@ -555,48 +831,103 @@ def health_check():
 
 
 @app.get("/students", response_model=List[StudentProfile])
-def list_students():
-    return StudentManager.list_students()
+async def list_students():
+    return await StudentManager.list_students()
+
+
+@app.get("/students/stream")
+async def stream_students():
+    return StreamingResponse(
+        StudentManager.iter_students_ndjson(),
+        media_type="application/x-ndjson"
+    )
 
 
 @app.get("/students/{student_id}", response_model=StudentProfile)
-def get_student(student_id: str):
-    student = StudentManager.get_student(student_id)
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
+async def get_student(student: StudentProfile = Depends(get_student_or_404)):
     return student
 
 
 @app.post("/students", response_model=StudentProfile)
-def create_student(profile: StudentProfile):
-    return StudentManager.create_student(profile)
+async def create_student(profile: StudentProfile):
+    created = await StudentManager.create_student(profile)
+    # Reports cached for this student were built from the old profile; invalidate after
+    # the store write, and mark the update so reports still in flight are not cached either
+    _profile_updated_at[profile.student_id] = time.monotonic()
+    suffix = f":{profile.student_id}"
+    for key in [key for key in _report_cache if key.endswith(suffix)]:
+        del _report_cache[key]
+    return created
 
 
 @app.post("/tutor-report", response_model=TutorReport)
 async def generate_tutor_report(request: TutorRequest):
     try:
-        return report_generator.generate_report(request)
+        return await report_generator.generate_report(request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
 
 
+@app.post("/tutor-report/stream")
+async def generate_tutor_report_stream(request: TutorRequest):
+    async def generate_stream():
+        try:
+            async for section, value in report_generator.stream_report(request):
+                yield b"data: " + dumps({"section": section, "payload": jsonable_encoder(value)}) + b"\n\n"
+            
+            yield SSE_DONE_FRAME
+            
+        except Exception as e:
+            yield b"data: " + dumps({"error": str(e)}) + b"\n\n"
+    
+    return StreamingResponse(
+        generate_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
+    )
+
+
+# "UNIT:student_id" -> (expires_at, serialized TutorReport)
+_report_cache: Dict[str, Tuple[float, bytes]] = {}
+# student_id -> monotonic time of the last profile update, so reports started earlier are not cached
+_profile_updated_at: Dict[str, float] = {}
+
+
 @app.get("/tutor-report/{unit_code}", response_model=TutorReport)
 async def get_tutor_report_simple(unit_code: str, student_id: Optional[str] = None):
+    key = f"{unit_code.upper()}:{student_id or 'anon'}"
+    cached = _report_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return Response(content=cached[1], media_type="application/json")
+    
     request = TutorRequest(unit_code=unit_code.upper(), student_id=student_id)
-    return await generate_tutor_report(request)
+    started = time.monotonic()
+    fallbacks: List[str] = []
+    token = _report_fallbacks.set(fallbacks)
+    try:
+        report = await generate_tutor_report(request)
+    finally:
+        _report_fallbacks.reset(token)
+    body = report.model_dump_json().encode()
+    
+    # Placeholder details or rule-based stand-ins for failed LM calls are served but not
+    # cached, so the next request retries the upstream sources
+    if fallbacks or _profile_updated_at.get(student_id, 0.0) >= started:
+        return Response(content=body, media_type="application/json")
+    
+    if len(_report_cache) >= REPORT_CACHE_SIZE and key not in _report_cache:
+        del _report_cache[next(iter(_report_cache))]
+    _report_cache[key] = (time.monotonic() + REPORT_CACHE_TTL, body)
+    return Response(content=body, media_type="application/json")
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_with_tutor(request: ChatRequest):
-    student = StudentManager.get_student(request.student_id)
-    if not student:
-        raise HTTPException(status_code=404, detail=f"Student not found: {request.student_id}")
-    
+async def chat_with_tutor(request: ChatRequest, student: StudentProfile = Depends(get_chat_student)):
     try:
-        response_text = conversation_manager.chat(
+        response_text = await conversation_manager.chat(
             student_id=request.student_id,
             message=request.message,
-            student_profile=student.dict()
+            student_profile=student.as_context
         )
         
         return ChatResponse(
@@ -610,81 +941,20 @@ async def chat_with_tutor(request: ChatRequest):
 
 
 @app.post("/chat/stream")
-async def chat_with_tutor_stream(request: ChatRequest):
-    student = StudentManager.get_student(request.student_id)
-    if not student:
-        raise HTTPException(status_code=404, detail=f"Student not found: {request.student_id}")
-    
+async def chat_with_tutor_stream(request: ChatRequest, student: StudentProfile = Depends(get_chat_student)):
     async def generate_stream():
         try:
-            memory = conversation_manager.get_or_create_memory(request.student_id)
-            prompt = conversation_manager._build_prompt(
-                request.message,
-                memory.get_messages(),
-                student.dict()
-            )
+            async for content in conversation_manager.chat_stream(
+                student_id=request.student_id,
+                message=request.message,
+                student_profile=student.as_context
+            ):
+                yield _DATA_PREFIX + dumps(content)[1:-1] + _DATA_SUFFIX
             
-            if conversation_manager.enabled:
-                try:
-                    response = requests.post(
-                        f"{LM_STUDIO_URL}/chat/completions",
-                        json={
-                            "model": LM_STUDIO_MODEL,
-                            "messages": [
-                                {"role": "system", "content": "You are a helpful university tutor."},
-                                {"role": "user", "content": prompt}
-                            ],
-                            "temperature": 0.7,
-                            "max_tokens": 500,
-                            "stream": True
-                        },
-                        stream=True,
-                        timeout=60
-                    )
-                    
-                    full_response = ""
-                    for line in response.iter_lines():
-                        if line:
-                            line_text = line.decode('utf-8')
-                            if line_text.startswith('data: '):
-                                data = line_text[6:]
-                                if data == '[DONE]':
-                                    break
-                                try:
-                                    chunk = json.loads(data)
-                                    if 'choices' in chunk and len(chunk['choices']) > 0:
-                                        content = chunk['choices'][0].get('delta', {}).get('content', '')
-                                        if content:
-                                            full_response += content
-                                            yield f"data: {json.dumps({'content': content})}\n\n"
-                                except json.JSONDecodeError:
-                                    pass
-                    
-                    memory.add_message("student", request.message)
-                    memory.add_message("tutor", full_response)
-                    conversation_manager.set_student_context(request.student_id, student.dict())
-                    
-                    yield f"data: {json.dumps({'done': True})}\n\n"
-                    
-                except Exception:
-                    fallback = conversation_manager._fallback_response(request.message, student.dict())
-                    memory.add_message("student", request.message)
-                    memory.add_message("tutor", fallback)
-                    
-                    for word in fallback.split(' '):
-                        yield f"data: {json.dumps({'content': word + ' '})}\n\n"
-                    yield f"data: {json.dumps({'done': True})}\n\n"
-            else:
-                fallback = conversation_manager._fallback_response(request.message, student.dict())
-                memory.add_message("student", request.message)
-                memory.add_message("tutor", fallback)
-                
-                for word in fallback.split(' '):
-                    yield f"data: {json.dumps({'content': word + ' '})}\n\n"
-                yield f"data: {json.dumps({'done': True})}\n\n"
+            yield SSE_DONE_FRAME
                 
         except Exception as e:
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            yield b"data: " + dumps({"error": str(e)}) + b"\n\n"
     
     return StreamingResponse(
         generate_stream(),
@@ -693,22 +963,17 @@ async def chat_with_tutor_stream(request: ChatRequest):
     )
 
 
-@app.get("/chat/{student_id}/history", response_model=ChatHistory)
+@app.get("/chat/{student_id}/history", response_model=ChatHistory, dependencies=[Depends(get_student_or_404)])
 async def get_conversation_history(student_id: str):
-    student = StudentManager.get_student(student_id)
-    if not student:
-        raise HTTPException(status_code=404, detail=f"Student not found: {student_id}")
-    
-    messages = conversation_manager.get_conversation_history(student_id)
-    return ChatHistory(student_id=student_id, messages=messages, total_messages=len(messages))
+    # Served straight from the conversation log, without decoding and re-encoding each message
+    return StreamingResponse(
+        conversation_manager.iter_history_bytes(student_id),
+        media_type="application/json"
+    )
 
 
-@app.delete("/chat/{student_id}")
+@app.delete("/chat/{student_id}", dependencies=[Depends(get_student_or_404)])
 async def clear_conversation(student_id: str):
-    student = StudentManager.get_student(student_id)
-    if not student:
-        raise HTTPException(status_code=404, detail=f"Student not found: {student_id}")
-    
     conversation_manager.clear_conversation(student_id)
     return {"status": "cleared", "student_id": student_id}
 
@@ -1,7 +1,11 @@
-# Wrapper to run the ingestor module as a script from the project root
+# Wrapper to run the ingestor from the project root
 # Usage: python scripts\run_ingestor.py
-import runpy
+import os
+import sys
+
+# Make the project root importable so `backend` resolves as a package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from backend.ingestor import main
 
 if __name__ == '__main__':
-    # Run the package module as if using `python -m backend.ingestor`
-    runpy.run_module('backend.ingestor', run_name='__main__')
+    main()
@@ -2,17 +2,120 @@
 Complete System Test Suite
 
 Tests both Part 1 and Part 2 APIs with real integration scenarios.
-Run this after starting both API services.
+Run this after starting both API services, either directly:
+
+    python tests/test_complete_system.py [--quick | --full | --only NAME] [--verbose]
+
+or under pytest, spreading the tests over worker processes with pytest-xdist:
+
+    pytest tests/test_complete_system.py -n auto --dist=loadgroup
+
+Session fixtures are per xdist worker; --dist=loadgroup keeps the tests sharing
+the COMP1010 report on one worker so it is generated only once.
 """
 
-import requests
+import argparse
+import asyncio
+import contextvars
+import httpx
+import io
 import json
 import time
 import sys
+from functools import partial
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+from jsonschema import Draft202012Validator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pytest
+    import pytest_asyncio
+except ImportError:  # optional: only needed when run under pytest
+    pytest = None
+
+# Tests reading the COMP1010 report run on the same xdist worker (with --dist=loadgroup)
+comp1010_group = pytest.mark.xdist_group("comp1010_report") if pytest else (lambda test: test)
+
+
+def dumps(obj) -> bytes:
+    """Serialize to JSON bytes, using orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def loads(data: bytes):
+    """Deserialize JSON bytes, using orjson when it is installed."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 BASE_PART1 = "http://localhost:8000"
 BASE_PART2 = "http://localhost:8001"
 
+# Connection pool for each API client; independent tests share it concurrently
+HTTP_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8)
+
+# Request bodies are constant, so they are encoded once at import
+JSON_HEADERS = {"Content-Type": "application/json"}
+ELIGIBLE_BODY = dumps({"degree": "Bachelor of IT", "completed_units": ["COMP1000"], "query_units": ["COMP1010"]})
+NOT_ELIGIBLE_BODY = dumps({"degree": "Bachelor of IT", "completed_units": [], "query_units": ["COMP1010"]})
+REPORT_DEMO001_BODY = dumps({"unit_code": "COMP1010", "student_id": "demo001"})
+
+# Structure every COMP1010 tutor report must have; all violations are reported at once
+REPORT_SCHEMA = {
+    "type": "object",
+    "required": ["unit_code", "summary", "difficulty", "core_skills", "key_concepts",
+                 "study_plan", "quizzes", "public_resources"],
+    "properties": {
+        "unit_code": {"const": "COMP1010"},
+        "summary": {"type": "string"},
+        "difficulty": {"enum": ["easy", "medium", "hard"]},
+        "core_skills": {"type": "array", "minItems": 1},
+        "key_concepts": {"type": "array", "minItems": 1},
+        "study_plan": {"type": "array", "minItems": 4, "maxItems": 4},
+        "quizzes": {"type": "array", "minItems": 1},
+        "public_resources": {"type": "array", "minItems": 1},
+    },
+}
+REPORT_VALIDATOR = Draft202012Validator(REPORT_SCHEMA)
+
+# Test name -> tests that must pass first; a test whose parent failed or was skipped is skipped,
+# so a broken service fails fast instead of waiting on report generation
+TEST_DEPENDENCIES = {
+    "Part 1 Basic": [],
+    "Part 1 Eligibility": ["Part 1 Basic"],
+    "Part 2 Basic": [],
+    "Student Management": ["Part 2 Basic"],
+    "Report Generation": ["Part 1 Basic", "Part 2 Basic"],
+    "Report (No Student)": ["Part 2 Basic"],
+    "Integration": ["Part 1 Eligibility", "Report Generation"],
+}
+
+# Tests run by --quick: one fast check per service plus the lighter report
+QUICK_TESTS = {"Part 1 Basic", "Part 2 Basic", "Report (No Student)"}
+
+# Set by --verbose: print the full traceback of a failed test, not just the exception
+VERBOSE = False
+
+# Per-stage timeouts: a stalled server fails on connect within seconds, while
+# report generation (LLM + web search) still gets a long read timeout
+REQUEST_TIMEOUT = httpx.Timeout(5.0, connect=1.0)
+REPORT_TIMEOUT = httpx.Timeout(connect=2.0, read=120.0, write=10.0, pool=1.0)
+
+# Readiness probing: per-probe timeout and backoff bounds, in seconds
+PROBE_TIMEOUT = 0.5
+PROBE_INTERVAL_MIN = 0.05
+PROBE_INTERVAL_MAX = 1.0
+
+# Output of a concurrently running test, written to stdout in one call when it finishes
+_output: contextvars.ContextVar = contextvars.ContextVar("output", default=None)
+
 
 class Colors:
     """ANSI color codes for terminal output."""
@@ -24,323 +127,397 @@ class Colors:
     BOLD = '\033[1m'
 
 
+# Message templates with the colour codes folded in; only the text is formatted per call
+_RULE = f"{Colors.BOLD}{Colors.BLUE}{'='*70}{Colors.RESET}"
+HEADER_TEMPLATE = f"\n{_RULE}\n{Colors.BOLD}{Colors.BLUE}  %s{Colors.RESET}\n{_RULE}\n\n"
+SUCCESS_TEMPLATE = f"{Colors.GREEN}[PASS] %s{Colors.RESET}\n"
+ERROR_TEMPLATE = f"{Colors.RED}[FAIL] %s{Colors.RESET}\n"
+INFO_TEMPLATE = f"{Colors.BLUE}[INFO] %s{Colors.RESET}\n"
+SKIP_TEMPLATE = f"{Colors.YELLOW}[SKIP] %s{Colors.RESET}\n"
+
+
+def emit(text: str) -> None:
+    """Write text to stdout, or buffer it when called from a test run by run_buffered."""
+    buffer = _output.get()
+    if buffer is None:
+        sys.stdout.write(text)
+    else:
+        buffer.write(text)
+
+
 def print_header(text: str) -> None:
     """Print a section header."""
-    print(f"\n{Colors.BOLD}{Colors.BLUE}{'='*70}{Colors.RESET}")
-    print(f"{Colors.BOLD}{Colors.BLUE}  {text}{Colors.RESET}")
-    print(f"{Colors.BOLD}{Colors.BLUE}{'='*70}{Colors.RESET}\n")
+    emit(HEADER_TEMPLATE % text)
 
 
 def print_success(text: str) -> None:
     """Print a success message."""
-    print(f"{Colors.GREEN}[PASS] {text}{Colors.RESET}")
+    emit(SUCCESS_TEMPLATE % text)
 
 
 def print_error(text: str) -> None:
     """Print an error message."""
-    print(f"{Colors.RED}[FAIL] {text}{Colors.RESET}")
+    emit(ERROR_TEMPLATE % text)
 
 
 def print_info(text: str) -> None:
     """Print an info message."""
-    print(f"{Colors.BLUE}[INFO] {text}{Colors.RESET}")
+    emit(INFO_TEMPLATE % text)
+
+
+def print_skip(text: str) -> None:
+    """Print a skipped-test message."""
+    emit(SKIP_TEMPLATE % text)
+
+
+def api_client(base_url: str) -> httpx.AsyncClient:
+    """Pooled client for one of the APIs."""
+    return httpx.AsyncClient(base_url=base_url, timeout=REQUEST_TIMEOUT, limits=HTTP_LIMITS)
+
+
+async def run_buffered(make_test: Callable[[], Awaitable[bool]]) -> bool:
+    """Create and await a test, printing its output in one block so concurrent tests don't interleave."""
+    # Each gathered coroutine runs in its own task and context, so the buffer is per test.
+    # The test is created only after the buffer is set, so futures it starts (e.g. report
+    # fetches) copy a context that writes to this buffer too.
+    buffer = io.StringIO()
+    _output.set(buffer)
+    try:
+        return await make_test()
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
 
 
-def wait_for_api(url: str, name: str, timeout: int = 30) -> bool:
+async def wait_for_api(client: httpx.AsyncClient, name: str, timeout: int = 30) -> bool:
     """Wait for an API to be ready."""
     print_info(f"Waiting for {name}...")
     start = time.time()
+    # Probe quickly at first, backing off while the service is still starting
+    interval = PROBE_INTERVAL_MIN
     while time.time() - start < timeout:
         try:
-            r = requests.get(f"{url}/health", timeout=2)
-            if r.status_code == 200:
+            r = await client.get("/health", timeout=PROBE_TIMEOUT)
+            if r.is_success:
                 print_success(f"{name} is ready")
                 return True
-        except Exception:
-            time.sleep(1)
-            sys.stdout.write('.')
-            sys.stdout.flush()
+        except (httpx.ConnectError, httpx.TimeoutException):
+            # Not listening yet; anything else (e.g. a bad URL) is a real error and propagates
+            pass
+        await asyncio.sleep(interval)
+        interval = min(interval * 1.5, PROBE_INTERVAL_MAX)
+        sys.stdout.write('.')
+        sys.stdout.flush()
     print_error(f"{name} failed to start")
     return False
 
 
-def test_part1_basic() -> bool:
-    """Test Part 1 basic functionality."""
-    print_header("Part 1: Basic Tests")
+if pytest:
+    pytestmark = pytest.mark.asyncio
+    
+    @pytest.fixture(scope="session", autouse=True)
+    def services_ready():
+        """Check both APIs once per pytest worker before any test runs."""
+        async def check() -> bool:
+            async with api_client(BASE_PART1) as part1, api_client(BASE_PART2) as part2:
+                return await wait_for_api(part1, "Part 1 API") and await wait_for_api(part2, "Part 2 API", timeout=60)
+        
+        if not asyncio.run(check()):
+            pytest.exit("Part 1 and Part 2 APIs must be running", returncode=1)
+    
+    @pytest_asyncio.fixture
+    async def part1():
+        async with api_client(BASE_PART1) as client:
+            yield client
+    
+    @pytest_asyncio.fixture
+    async def part2():
+        async with api_client(BASE_PART2) as client:
+            yield client
+    
+    @pytest.fixture(scope="session")
+    def comp1010_report() -> dict:
+        async def fetch() -> dict:
+            async with api_client(BASE_PART2) as client:
+                return await fetch_report(client, "COMP1010", REPORT_DEMO001_BODY)
+        return asyncio.run(fetch())
+    
+    @pytest.fixture(scope="session")
+    def comp1000_report() -> dict:
+        async def fetch() -> dict:
+            async with api_client(BASE_PART2) as client:
+                return await fetch_report(client, "COMP1000")
+        return asyncio.run(fetch())
+
+
+async def fetch_report(part2: httpx.AsyncClient, unit_code: str, body: bytes = None) -> dict:
+    """Generate a tutor report once per run, or once per xdist worker under pytest;
+    every test checking that report shares the result. With a request body the report is POSTed, otherwise the GET variant is used."""
+    start_ns = time.perf_counter_ns()
+    if body:
+        r = await part2.post("/tutor-report", content=body, headers=JSON_HEADERS, timeout=REPORT_TIMEOUT)
+    else:
+        r = await part2.get(f"/tutor-report/{unit_code}", timeout=REPORT_TIMEOUT)
     
+    elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+    r.raise_for_status()
+    print_info(f"Report for {unit_code} generated in {elapsed:.1f}s")
+    return loads(r.content)
+
+
+async def with_report(test, report: asyncio.Future) -> None:
+    """Run a report test once the shared report has been fetched."""
+    await test(await report)
+
+
+def with_dependencies(names: Iterable[str]) -> Set[str]:
+    """The named tests plus every test they depend on."""
+    selected = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(TEST_DEPENDENCIES[name])
+    return selected
+
+
+async def run_test(name: str, test) -> bool:
+    """Await a test coroutine, reporting a failed assertion or request as FAIL."""
     try:
-        # Health check
-        r = requests.get(f"{BASE_PART1}/health", timeout=5)
-        assert r.status_code == 200
-        print_success("Health check passed")
-        
-        # Get unit
-        r = requests.get(f"{BASE_PART1}/unit/COMP1000", timeout=5)
-        assert r.status_code == 200
-        unit = r.json()
-        assert "details" in unit
-        print_success(f"Unit fetch: {unit['details']['title']}")
-        
-        # Get another unit
-        r = requests.get(f"{BASE_PART1}/unit/COMP1010", timeout=5)
-        assert r.status_code == 200
-        unit = r.json()
-        print_success(f"Unit fetch: {unit['details']['title']}")
-        
+        await test
         return True
     except Exception as e:
-        print_error(f"Part 1 basic test failed: {e}")
+        print_error(f"{name} test failed: {e!r}")
+        if VERBOSE:
+            import traceback
+            emit(traceback.format_exc())
         return False
 
 
-def test_part1_eligibility() -> bool:
+async def test_part1_basic(part1: httpx.AsyncClient) -> None:
+    """Test Part 1 basic functionality."""
+    print_header("Part 1: Basic Tests")
+    
+    # Health check
+    r = await part1.get("/health", timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    print_success("Health check passed")
+    
+    # Get units (independent, so fetched concurrently)
+    responses = await asyncio.gather(
+        part1.get("/unit/COMP1000", timeout=REQUEST_TIMEOUT),
+        part1.get("/unit/COMP1010", timeout=REQUEST_TIMEOUT)
+    )
+    for r in responses:
+        r.raise_for_status()
+        unit = loads(r.content)
+        assert "details" in unit
+        print_success(f"Unit fetch: {unit['details']['title']}")
+
+
+async def test_part1_eligibility(part1: httpx.AsyncClient) -> None:
     """Test Part 1 eligibility checking."""
     print_header("Part 1: Eligibility Tests")
     
-    try:
-        # Test 1: Should be eligible (has prerequisites)
-        r = requests.post(f"{BASE_PART1}/eligibility", json={
-            "degree": "Bachelor of IT",
-            "completed_units": ["COMP1000"],
-            "query_units": ["COMP1010"]
-        }, timeout=5)
-        
-        result = r.json()
-        assert result["eligible"] == True
-        print_success("Eligibility check: PASS (has prerequisites)")
-        
-        # Test 2: Should NOT be eligible (missing prerequisites)
-        r = requests.post(f"{BASE_PART1}/eligibility", json={
-            "degree": "Bachelor of IT",
-            "completed_units": [],
-            "query_units": ["COMP1010"]
-        }, timeout=5)
-        
-        result = r.json()
-        assert result["eligible"] == False
-        assert "COMP1000" in result["missing_prerequisites"]
-        print_success("Eligibility check: FAIL (missing prerequisites) - Correct!")
-        
-        return True
-    except Exception as e:
-        print_error(f"Part 1 eligibility test failed: {e}")
-        return False
+    # Test 1: Should be eligible (has prerequisites)
+    r = await part1.post("/eligibility", content=ELIGIBLE_BODY, headers=JSON_HEADERS, timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    
+    result = loads(r.content)
+    assert result["eligible"] == True
+    print_success("Eligibility check: PASS (has prerequisites)")
+    
+    # Test 2: Should NOT be eligible (missing prerequisites)
+    r = await part1.post("/eligibility", content=NOT_ELIGIBLE_BODY, headers=JSON_HEADERS, timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    
+    result = loads(r.content)
+    assert result["eligible"] == False
+    assert "COMP1000" in result["missing_prerequisites"]
+    print_success("Eligibility check: FAIL (missing prerequisites) - Correct!")
 
 
-def test_part2_basic() -> bool:
+async def test_part2_basic(part2: httpx.AsyncClient) -> None:
     """Test Part 2 basic functionality."""
     print_header("Part 2: Basic Tests")
     
-    try:
-        # Health check
-        r = requests.get(f"{BASE_PART2}/health", timeout=5)
-        assert r.status_code == 200
-        health = r.json()
-        print_success(f"Health check: {health['status']}")
-        print_info(f"  AI Ready: {health.get('ai_ready', 'N/A')}")
-        print_info(f"  Search Ready: {health.get('search_ready', 'N/A')}")
-        
-        # Root endpoint
-        r = requests.get(f"{BASE_PART2}/", timeout=5)
-        info = r.json()
-        print_success(f"Service: {info['service']} v{info['version']}")
-        
-        return True
-    except Exception as e:
-        print_error(f"Part 2 basic test failed: {e}")
-        return False
+    # Health check
+    r = await part2.get("/health", timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    health = loads(r.content)
+    print_success(f"Health check: {health['status']}")
+    print_info(f"  AI Ready: {health.get('ai_ready', 'N/A')}")
+    print_info(f"  Search Ready: {health.get('search_ready', 'N/A')}")
+    
+    # Root endpoint
+    r = await part2.get("/", timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    info = loads(r.content)
+    print_success(f"Service: {info['service']} v{info['version']}")
 
 
-def test_student_management() -> bool:
+async def test_student_management(part2: httpx.AsyncClient) -> None:
     """Test student management features."""
     print_header("Part 2: Student Management")
     
-    try:
-        # List students
-        r = requests.get(f"{BASE_PART2}/students", timeout=5)
-        students = r.json()
-        assert len(students) >= 2
-        print_success(f"Found {len(students)} demo students")
-        
-        # Get specific students
-        for student_id in ["demo001", "demo002"]:
-            r = requests.get(f"{BASE_PART2}/students/{student_id}", timeout=5)
-            student = r.json()
-            print_success(f"  - {student['name']}: {student['degree']}")
-            print_info(f"    Completed: {len(student['completed_units'])} units")
-            print_info(f"    Enrolled: {len(student['enrolled_units'])} units")
-        
-        return True
-    except Exception as e:
-        print_error(f"Student management test failed: {e}")
-        return False
-
-
-def test_report_generation() -> bool:
+    # List students
+    r = await part2.get("/students", timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    students = loads(r.content)
+    assert len(students) >= 2
+    print_success(f"Found {len(students)} demo students")
+    
+    # Get specific students
+    responses = await asyncio.gather(*(
+        part2.get(f"/students/{student_id}", timeout=REQUEST_TIMEOUT)
+        for student_id in ["demo001", "demo002"]
+    ))
+    for r in responses:
+        r.raise_for_status()
+        student = loads(r.content)
+        print_success(f"  - {student['name']}: {student['degree']}")
+        print_info(f"    Completed: {len(student['completed_units'])} units")
+        print_info(f"    Enrolled: {len(student['enrolled_units'])} units")
+
+
+@comp1010_group
+async def test_report_generation(comp1010_report: dict) -> None:
     """Test report generation with AI and web search."""
-    print_header("Part 2: Report Generation (This may take 30-60s)")
+    print_header("Part 2: Report Generation")
     
-    try:
-        print_info("Generating report for COMP1010 with student demo001...")
-        print_info("(Watch for web search activity in Part 2 terminal)")
-        
-        start_time = time.time()
-        
-        r = requests.post(f"{BASE_PART2}/tutor-report", json={
-            "unit_code": "COMP1010",
-            "student_id": "demo001"
-        }, timeout=120)
-        
-        elapsed = time.time() - start_time
-        
-        assert r.status_code == 200
-        report = r.json()
-        
-        print_success(f"Report generated in {elapsed:.1f}s")
-        
-        # Verify structure
-        assert report["unit_code"] == "COMP1010"
-        print_success(f"Unit code: {report['unit_code']}")
-        
-        assert "summary" in report
-        print_success(f"Summary: {report['summary'][:80]}...")
-        
-        assert report["difficulty"] in ["easy", "medium", "hard"]
-        print_success(f"Difficulty: {report['difficulty'].upper()}")
-        
-        assert len(report.get("core_skills", [])) > 0
-        print_success(f"Core skills: {len(report['core_skills'])} skills")
-        
-        assert len(report.get("key_concepts", [])) > 0
-        print_success(f"Key concepts: {len(report['key_concepts'])} concepts")
-        
-        assert len(report.get("study_plan", [])) == 4
-        print_success("Study plan: 4 weeks")
-        
-        assert len(report.get("quizzes", [])) > 0
-        print_success(f"Quizzes: {len(report['quizzes'])} questions")
-        
-        assert len(report.get("public_resources", [])) > 0
-        print_success(f"Resources: {len(report['public_resources'])} resources")
-        
-        # Check if resources are real web results
-        print_info("\n  Real web search results:")
-        for i, resource in enumerate(report["public_resources"][:3], 1):
-            print_info(f"    {i}. [{resource['type'].upper()}] {resource['title'][:50]}...")
-            print_info(f"       {resource['url'][:60]}...")
-        
-        return True
-    except Exception as e:
-        print_error(f"Report generation test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    report = comp1010_report
+    print_success("Report generated for COMP1010 with student demo001")
+    
+    # Verify structure
+    errors = [f"{'/'.join(map(str, error.path)) or 'report'}: {error.message}"
+              for error in REPORT_VALIDATOR.iter_errors(report)]
+    assert not errors, "; ".join(errors)
+    
+    print_success(f"Unit code: {report['unit_code']}")
+    print_success(f"Summary: {report['summary'][:80]}...")
+    print_success(f"Difficulty: {report['difficulty'].upper()}")
+    print_success(f"Core skills: {len(report['core_skills'])} skills")
+    print_success(f"Key concepts: {len(report['key_concepts'])} concepts")
+    print_success("Study plan: 4 weeks")
+    print_success(f"Quizzes: {len(report['quizzes'])} questions")
+    print_success(f"Resources: {len(report['public_resources'])} resources")
+    
+    # Check if resources are real web results
+    print_info("\n  Real web search results:")
+    for i, resource in enumerate(report["public_resources"][:3], 1):
+        print_info(f"    {i}. [{resource['type'].upper()}] {resource['title'][:50]}...")
+        print_info(f"       {resource['url'][:60]}...")
 
 
-def test_report_without_student() -> bool:
+async def test_report_without_student(comp1000_report: dict) -> None:
     """Test report generation without student profile."""
     print_header("Part 2: Report Without Student Profile")
     
-    try:
-        print_info("Generating report for COMP1000 (no student)...")
-        
-        r = requests.get(f"{BASE_PART2}/tutor-report/COMP1000", timeout=120)
-        
-        assert r.status_code == 200
-        report = r.json()
-        
-        print_success("Report generated successfully")
-        print_success(f"Difficulty: {report['difficulty']}")
-        print_success(f"Resources: {len(report['public_resources'])} found")
-        
-        return True
-    except Exception as e:
-        print_error(f"Report without student test failed: {e}")
-        return False
+    report = comp1000_report
+    assert report["unit_code"] == "COMP1000"
+    
+    print_success("Report generated successfully")
+    print_success(f"Difficulty: {report['difficulty']}")
+    print_success(f"Resources: {len(report['public_resources'])} found")
 
 
-def test_integration() -> bool:
+@comp1010_group
+async def test_integration(part1: httpx.AsyncClient, comp1010_report: dict) -> None:
     """Test full Part 1 + Part 2 integration."""
     print_header("Integration Test: Part 1 + Part 2")
     
-    try:
-        # Step 1: Check eligibility in Part 1
-        print_info("Step 1: Checking eligibility in Part 1...")
-        r = requests.post(f"{BASE_PART1}/eligibility", json={
-            "degree": "Bachelor of IT",
-            "completed_units": ["COMP1000"],
-            "query_units": ["COMP1010"]
-        }, timeout=5)
-        
-        eligibility = r.json()
-        assert eligibility["eligible"] == True
-        print_success("Student is eligible for COMP1010")
-        
-        # Step 2: Generate study plan in Part 2
-        print_info("Step 2: Generating study plan in Part 2...")
-        r = requests.post(f"{BASE_PART2}/tutor-report", json={
-            "unit_code": "COMP1010",
-            "completed_units": ["COMP1000"]
-        }, timeout=120)
-        
-        report = r.json()
-        print_success("Study plan generated")
-        
-        # Step 3: Verify consistency
-        print_info("Step 3: Verifying data consistency...")
-        assert report["unit_code"] == "COMP1010"
-        
-        print_success("Integration test passed!")
-        return True
-        
-    except Exception as e:
-        print_error(f"Integration test failed: {e}")
-        return False
+    # Step 1: Check eligibility in Part 1
+    print_info("Step 1: Checking eligibility in Part 1...")
+    r = await part1.post("/eligibility", content=ELIGIBLE_BODY, headers=JSON_HEADERS, timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    
+    eligibility = loads(r.content)
+    assert eligibility["eligible"] == True
+    print_success("Student is eligible for COMP1010")
+    
+    # Step 2: Study plan generated in Part 2 (shared with test_report_generation)
+    print_info("Step 2: Checking the study plan from Part 2...")
+    report = comp1010_report
+    print_success("Study plan generated")
+    
+    # Step 3: Verify consistency
+    print_info("Step 3: Verifying data consistency...")
+    assert report["unit_code"] == "COMP1010"
+    
+    print_success("Integration test passed!")
 
 
-def run_all_tests() -> bool:
-    """Run complete test suite."""
+async def run_all_tests(selected: Optional[Set[str]] = None) -> bool:
+    """Run complete test suite, or only the selected tests (which must include their dependencies)."""
     print("\n" + "="*70)
     print(f"{Colors.BOLD}  DegreePath Tutor - Complete Test Suite{Colors.RESET}")
     print("="*70)
     
-    # Check if services are running
-    print_header("Pre-flight Checks")
-    
-    if not wait_for_api(BASE_PART1, "Part 1 API"):
-        print_error("\nPart 1 API is not running!")
-        print_info("Start it with: cd backend && python main.py")
-        return False
-    
-    if not wait_for_api(BASE_PART2, "Part 2 API", timeout=60):
-        print_error("\nPart 2 API is not running!")
-        print_info("Start it with: cd part2 && python main.py")
-        return False
-    
-    # Run tests
-    results = []
-    
-    results.append(("Part 1 Basic", test_part1_basic()))
-    results.append(("Part 1 Eligibility", test_part1_eligibility()))
-    results.append(("Part 2 Basic", test_part2_basic()))
-    results.append(("Student Management", test_student_management()))
-    results.append(("Report Generation", test_report_generation()))
-    results.append(("Report (No Student)", test_report_without_student()))
-    results.append(("Integration", test_integration()))
+    async with api_client(BASE_PART1) as part1, api_client(BASE_PART2) as part2:
+        # Check if services are running
+        print_header("Pre-flight Checks")
+        
+        if not await wait_for_api(part1, "Part 1 API"):
+            print_error("\nPart 1 API is not running!")
+            print_info("Start it with: cd backend && python main.py")
+            return False
+        
+        if not await wait_for_api(part2, "Part 2 API", timeout=60):
+            print_error("\nPart 2 API is not running!")
+            print_info("Start it with: cd part2 && python main.py")
+            return False
+        
+        # Each report is generated once, on first use, and shared by the tests that check it
+        reports: Dict[str, asyncio.Future] = {}
+        
+        def report(unit_code: str, body: bytes = None) -> asyncio.Future:
+            if unit_code not in reports:
+                print_info(f"Generating report for {unit_code} (this may take 30-60s)...")
+                reports[unit_code] = asyncio.ensure_future(fetch_report(part2, unit_code, body))
+            return reports[unit_code]
+        
+        tests = {
+            "Part 1 Basic": lambda: test_part1_basic(part1),
+            "Part 1 Eligibility": lambda: test_part1_eligibility(part1),
+            "Part 2 Basic": lambda: test_part2_basic(part2),
+            "Student Management": lambda: test_student_management(part2),
+            "Report Generation": lambda: with_report(test_report_generation, report("COMP1010", REPORT_DEMO001_BODY)),
+            "Report (No Student)": lambda: with_report(test_report_without_student, report("COMP1000")),
+            "Integration": lambda: with_report(partial(test_integration, part1), report("COMP1010", REPORT_DEMO001_BODY)),
+        }
+        
+        # Every test starts as soon as its parents pass, so independent tests run concurrently
+        tasks: Dict[str, asyncio.Task] = {}
+        
+        async def gated(name: str) -> Optional[bool]:
+            parents = await asyncio.gather(*(tasks[parent] for parent in TEST_DEPENDENCIES[name]))
+            if not all(parents):
+                return None
+            return await run_buffered(lambda: run_test(name, tests[name]()))
+        
+        for name in TEST_DEPENDENCIES:
+            if selected is None or name in selected:
+                tasks[name] = asyncio.ensure_future(gated(name))
+        outcomes = await asyncio.gather(*tasks.values())
+        results = list(zip(tasks, outcomes))
     
     # Summary
     print_header("Test Summary")
     
     passed = sum(1 for _, result in results if result)
+    skipped = sum(1 for _, result in results if result is None)
     total = len(results)
     
     for name, result in results:
         if result:
             print_success(f"{name:<30} PASSED")
+        elif result is None:
+            print_skip(f"{name:<30} SKIPPED")
         else:
             print_error(f"{name:<30} FAILED")
     
-    print(f"\n{Colors.BOLD}Results: {passed}/{total} tests passed{Colors.RESET}")
+    print(f"\n{Colors.BOLD}Results: {passed}/{total} tests passed, {skipped} skipped{Colors.RESET}")
     
     if passed == total:
         print(f"\n{Colors.GREEN}{Colors.BOLD}ALL TESTS PASSED! System is working correctly.{Colors.RESET}\n")
@@ -351,5 +528,16 @@ def run_all_tests() -> bool:
 
 
 if __name__ == "__main__":
-    success = run_all_tests()
+    parser = argparse.ArgumentParser(description="DegreePath Tutor system tests")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--quick", action="store_true", help="run only the fast smoke tests")
+    mode.add_argument("--full", action="store_true", help="run every test (default)")
+    mode.add_argument("--only", choices=list(TEST_DEPENDENCIES), metavar="NAME",
+                      help="run one test and the tests it depends on")
+    parser.add_argument("--verbose", action="store_true", help="print tracebacks of failed tests")
+    args = parser.parse_args()
+    VERBOSE = args.verbose
+    
+    names = QUICK_TESTS if args.quick else {args.only} if args.only else None
+    success = asyncio.run(run_all_tests(with_dependencies(names) if names else None))
     sys.exit(0 if success else 1)
@@ -1,4 +1,5 @@
 import asyncio
+import statistics
 import time
 import sys
 import os
@@ -8,35 +9,49 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.rag import rag_system
 
+# Timed runs of the benchmark query; the first is the uncached measurement
+QUERY_RUNS = 5
+
+
+def format_duration(ns: int) -> str:
+    """Seconds, or microseconds for sub-millisecond timings."""
+    if ns < 1_000_000:
+        return f"{ns / 1e3:.1f}\u03bcs"
+    return f"{ns / 1e9:.4f}s"
+
 async def test_rag():
     print("Starting RAG Test...")
     
-    # Measure Ingestion Time
-    start_time = time.time()
-    await rag_system.ingest_skills()
-    await rag_system.ingest_materials()
-    # Note: ingest_units might take longer if DB is large, but we'll test it.
-    await rag_system.ingest_units()
-    ingest_time = time.time() - start_time
-    print(f"Ingestion Time: {ingest_time:.4f}s")
+    # Measure Ingestion Time (skills, materials and units are ingested concurrently)
+    start_ns = time.perf_counter_ns()
+    await rag_system.ingest_all()
+    ingest_ns = time.perf_counter_ns() - start_ns
+    print(f"Ingestion Time: {format_duration(ingest_ns)}")
+    
+    # Warm up the embedding model and index so the timed runs measure retrieval only
+    await rag_system.query("__warmup__")
     
-    # Measure Retrieval Time (First Run - Uncached)
     query = "What are the prerequisites for COMP1000?"
-    start_time = time.time()
-    results = await rag_system.query(query)
-    retrieval_time = time.time() - start_time
-    print(f"Retrieval Time (Uncached): {retrieval_time:.4f}s")
+    times_ns = []
+    for _ in range(QUERY_RUNS):
+        start_ns = time.perf_counter_ns()
+        results = await rag_system.query(query)
+        times_ns.append(time.perf_counter_ns() - start_ns)
+    
+    # Measure Retrieval Time (First Run - Uncached)
+    retrieval_time = times_ns[0] / 1e9
+    print(f"Retrieval Time (Uncached): {format_duration(times_ns[0])}")
     
     if retrieval_time > 0.2:
         print("WARNING: Retrieval time > 200ms")
     
     print(f"Top Result: {results[0]['content'][:100]}...")
     
-    # Measure Retrieval Time (Second Run - Cached)
-    start_time = time.time()
-    results_cached = await rag_system.query(query)
-    cached_time = time.time() - start_time
-    print(f"Retrieval Time (Cached): {cached_time:.4f}s")
+    # Measure Retrieval Time (Repeat Runs - Cached)
+    cached_ns = statistics.median(times_ns[1:])
+    cached_time = cached_ns / 1e9
+    print(f"Retrieval Time (Cached): {format_duration(int(cached_ns))} median, "
+          f"{format_duration(min(times_ns[1:]))} min over {QUERY_RUNS - 1} runs")
     
     if cached_time < retrieval_time:
         print("SUCCESS: Caching is working (faster response).")